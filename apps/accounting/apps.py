@@ -7,3 +7,6 @@ class AccountingConfig(AppConfig):
     label = "accounting"
     name = "apps.accounting"
     verbose_name = _("Accounting")
+
+    def ready(self):
+        from apps.accounting import signals  # noqa: F401
@@ -0,0 +1,131 @@
+"""
+In-process cache of the chart of accounts.
+
+The chart of accounts of a tenant is small & rarely changes, but accounts
+are looked up on every ledger posting and on most accounting serializers.
+We keep one copy of it per tenant schema, keyed by id & code, which is
+dropped whenever an Account or AccountSubType is saved or deleted
+(see `apps.accounting.signals`), and after `CHART_OF_ACCOUNTS_TIMEOUT`.
+
+The copy holds the column values of the rows only, a new model instance
+is built on every lookup so none is shared between threads or requests.
+
+A version number per schema is kept in Django's cache framework so that
+other processes drop their copy too.
+"""
+
+import time
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+_charts = {}
+
+
+def _to_rows(queryset):
+    opts = queryset.model._meta
+    fields = [field.attname for field in opts.concrete_fields]
+    pk = fields.index(opts.pk.attname)
+    return fields, {row[pk]: row for row in queryset.values_list(*fields)}
+
+
+def _version_key(schema_name):
+    return f"chart-of-accounts:{schema_name}:version"
+
+
+class ChartOfAccounts:
+    def __init__(self, version, sub_types, accounts):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.sub_type_model = sub_types.model
+        self.account_model = accounts.model
+        self.sub_type_fields, self.sub_types = _to_rows(sub_types)
+        self.account_fields, self.accounts = _to_rows(accounts)
+        code = self.account_fields.index("code")
+        self.account_ids_by_code = {row[code]: pk for pk, row in self.accounts.items()}
+
+    @property
+    def is_expired(self):
+        return time.monotonic() - self.loaded_at > settings.CHART_OF_ACCOUNTS_TIMEOUT
+
+    def get_account(self, pk, active_only=False):
+        row = self.accounts.get(pk)
+        if row is None:
+            return None
+        account = self.account_model.from_db(None, self.account_fields, row)
+        if active_only and account.is_archived:
+            return None
+        # set the sub type so `account.type` needs no query
+        account.sub_type = self.get_sub_type(account.sub_type_id)
+        return account
+
+    def get_accounts(self):
+        return [self.get_account(pk) for pk in self.accounts]
+
+    def get_sub_type(self, pk):
+        row = self.sub_types.get(pk)
+        if row is None:
+            return None
+        return self.sub_type_model.from_db(None, self.sub_type_fields, row)
+
+    def get_accounts_by_code(self, codes, active_only=False):
+        accounts = {}
+        for code in codes:
+            account = self.get_account(self.account_ids_by_code.get(code), active_only)
+            if account is not None:
+                accounts[code] = account
+        return accounts
+
+
+def get_chart(reload=False):
+    """
+    Return the chart of accounts of the current tenant schema,
+    loading it from the db on first use.
+    """
+    schema_name = connection.schema_name
+    version = cache.get(_version_key(schema_name), 0)
+    chart = _charts.get(schema_name)
+    if reload or chart is None or chart.version != version or chart.is_expired:
+        AccountSubType = apps.get_model("accounting.AccountSubType")
+        Account = apps.get_model("accounting.Account")
+        chart = ChartOfAccounts(
+            version, AccountSubType.objects.all(), Account.objects.all()
+        )
+        _charts[schema_name] = chart
+    return chart
+
+
+def clear_chart(schema_name=None):
+    schema_name = schema_name or connection.schema_name
+    _charts.pop(schema_name, None)
+    try:
+        cache.incr(_version_key(schema_name))
+    except ValueError:
+        cache.set(_version_key(schema_name), 1, timeout=None)
+
+
+def get_accounts_by_code(codes, active_only=False):
+    """
+    Return {code: account} for `codes`. The chart is reloaded once if
+    any code is missing, in case it was created by another process.
+    """
+    codes = set(codes)
+    accounts = get_chart().get_accounts_by_code(codes, active_only)
+    if len(accounts) != len(codes):
+        accounts = get_chart(reload=True).get_accounts_by_code(codes, active_only)
+    return accounts
+
+
+def get_account(pk, active_only=False):
+    account = get_chart().get_account(pk, active_only)
+    if account is None:
+        account = get_chart(reload=True).get_account(pk, active_only)
+    return account
+
+
+def get_sub_type(pk):
+    sub_type = get_chart().get_sub_type(pk)
+    if sub_type is None:
+        sub_type = get_chart(reload=True).get_sub_type(pk)
+    return sub_type
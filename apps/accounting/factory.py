@@ -1,5 +1,7 @@
 from django_tenants.utils import schema_context
+from apps.accounting.cache import clear_chart
 from apps.accounting.models import Account, AccountSubType, AccountType
+from core.cache import invalidate_models
 
 ACCOUNT_TYPE_CODE = {
     AccountType.ASSET: 1000,
@@ -85,6 +87,10 @@ class AccountingFactory:
             sub_types = self._generate_sub_types()
             parent_accounts = self._generate_parent_accounts(sub_types)
             self._generate_sub_accounts(parent_accounts)
+            # bulk_create sends no signals to invalidate the cached chart
+            # & the cached account responses
+            clear_chart()
+            invalidate_models(Account, AccountSubType)
 
     def _generate_sub_accounts(self, parent_accounts):
         sub_accounts_data = self._get_sub_accounts_data(parent_accounts)
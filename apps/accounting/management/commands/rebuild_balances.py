@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import schema_context
+from apps.accounting.models import AccountBalance
+
+
+class Command(BaseCommand):
+    help = "Recompute running account balances from the raw transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "schema_name", help="The tenant schema to rebuild balances in."
+        )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report accounts whose running balance is out of sync.",
+        )
+
+    def handle(self, *args, **options):
+        with schema_context(options["schema_name"]):
+            if options["verify"]:
+                self.verify()
+            else:
+                balances = AccountBalance.objects.rebuild()
+                self.stdout.write(f"Rebuilt balances for {len(balances)} accounts.")
+
+    def verify(self):
+        expected = AccountBalance.objects.compute_from_transactions()
+        stored = dict(AccountBalance.objects.values_list("account_id", "amount"))
+        mismatches = [
+            (account_id, stored.get(account_id, 0), expected.get(account_id, 0))
+            for account_id in set(expected) | set(stored)
+            if stored.get(account_id, 0) != expected.get(account_id, 0)
+        ]
+        for account_id, stored_amount, expected_amount in mismatches:
+            self.stdout.write(
+                f"Account {account_id}: stored {stored_amount}, expected {expected_amount}"
+            )
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} account balances are out of sync.")
+        self.stdout.write("All account balances are in sync.")
@@ -1,11 +1,16 @@
+from collections import defaultdict
 from datetime import datetime, timezone
+from decimal import ROUND_HALF_UP, Decimal
 from django.db import models
+from django.db.models import Case, DecimalField, F, Sum, Value, When
+from django.db.models.functions import Now
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import ValidationError, MultipleObjectsReturned
-from django.db import transaction
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
 from django.utils import timezone as django_timezone
 from django.apps import apps
 from django.conf import settings
+from apps.accounting.cache import get_accounts_by_code
 from apps.purchase.bill.models import Bill, PaymentMade
 from apps.purchase.expense.models import Expense
 from apps.sales.invoice.models import Invoice, PaymentReceived
@@ -16,6 +21,109 @@ class ActiveAccountManager(models.Manager):
         return super().get_queryset().filter(is_archived=False)
 
 
+class AccountBalanceManager(models.Manager):
+    """
+    Custom manager methods to maintain running account balances.
+    """
+
+    def apply_deltas(self, deltas):
+        """
+        Add each amount in `deltas` ({account_id: amount})
+        to the running balance of the account.
+        """
+        # accounts with a zero delta (e.g a transaction moved to another
+        # date) are written too, see `AccountBalanceSnapshotManager.take`
+        if not deltas:
+            return
+
+        # make sure every affected account has a balance row to update
+        self.bulk_create(
+            [self.model(account_id=account_id) for account_id in deltas],
+            ignore_conflicts=True,
+        )
+        self.filter(account_id__in=deltas).update(
+            amount=F("amount")
+            + Case(
+                *[
+                    When(account_id=account_id, then=Value(amount))
+                    for account_id, amount in deltas.items()
+                ],
+                default=Value(0),
+                output_field=DecimalField(max_digits=17, decimal_places=2),
+            ),
+            updated_at=Now(),
+        )
+
+    def compute_from_transactions(self):
+        """
+        Calculate the balance of every account from its raw transactions.
+        returns {account_id: amount}
+        """
+        Transaction = apps.get_model("accounting.Transaction")
+        return {
+            row["account_id"]: row["total"]
+            for row in Transaction.objects.order_by()
+            .values("account_id")
+            .annotate(total=Sum("amount"))
+        }
+
+    def rebuild(self):
+        """
+        Replace all running balances with balances
+        recomputed from the raw transactions.
+        """
+        with transaction.atomic():
+            balances = self.compute_from_transactions()
+            self.all().delete()
+            self.bulk_create(
+                [
+                    self.model(account_id=account_id, amount=amount)
+                    for account_id, amount in balances.items()
+                ]
+            )
+        return balances
+
+
+class AccountBalanceSnapshotManager(models.Manager):
+    """
+    Custom manager methods to maintain daily account balance snapshots.
+    """
+
+    def apply_deltas(self, deltas):
+        """
+        Add each amount in `deltas` ({(account_id, date): amount}) to the
+        snapshots of the account taken on or after the date, so snapshots
+        stay correct when transactions are back-dated, edited or deleted.
+        """
+        for (account_id, date), amount in deltas.items():
+            if amount:
+                self.filter(account_id=account_id, date__gte=date).update(
+                    amount=F("amount") + Value(amount)
+                )
+
+    def take(self, date):
+        """
+        Store the closing balance of every account as of `date`,
+        unless a snapshot was already taken for that date.
+        """
+        from apps.accounting.reports import balances_as_of
+
+        AccountBalance = apps.get_model("accounting.AccountBalance")
+        with transaction.atomic(), connection.cursor() as cursor:
+            # postings write the running balances before the snapshots, so
+            # this waits for the postings in flight to commit, and holds
+            # back new ones until the snapshots exist for them to adjust
+            table = connection.ops.quote_name(AccountBalance._meta.db_table)
+            cursor.execute(f"LOCK TABLE {table} IN SHARE MODE")
+            self.bulk_create(
+                [
+                    self.model(account_id=account_id, date=date, amount=amount)
+                    for account_id, amount in balances_as_of(date).items()
+                ],
+                ignore_conflicts=True,
+            )
+
+
 class TransactionManager(models.Manager):
     """
     Custon manager methods to record & delete
@@ -102,6 +210,12 @@ class TransactionManager(models.Manager):
                     "type": "credit",
                     "amount": bill.total_incl_tax,
                 },
+                {
+                    "name": f"Purchases for Bill {bill.number}",
+                    "account_code": "6014",
+                    "type": "debit",
+                    "amount": bill.total_excl_tax,
+                },
                 *[
                     {
                         "name": f"{tax_name} for Bill {bill.number}",
@@ -204,48 +318,157 @@ class TransactionManager(models.Manager):
             app_label=resource._meta.app_label,
             model=resource._meta.model_name,
         )
-        self.get_queryset().filter(ref_type=contenttype, ref_id=resource.id).delete()
+        with transaction.atomic():
+            self._delete_records(
+                self.get_queryset().filter(ref_type=contenttype, ref_id=resource.id)
+            )
 
     def _record_transaction(self, **kwargs):
-        account_model = self.model.account.field.related_model
+        """
+        Post all the transaction lines of a resource in one go.
+
+        Account codes are resolved from the cached chart of accounts, after
+        checking that the debits balance the credits. The lines are then diffed
+        against the ones already recorded for the resource, see `_sync_records`.
+        """
+        records = kwargs["transactions"]
+        self._check_balanced(records)
+
+        account_codes = {record["account_code"] for record in records}
+        accounts = get_accounts_by_code(account_codes, active_only=True)
+        if len(accounts) != len(account_codes):
+            raise ValidationError("Account provided was not found or is archived.")
+
         queryset = self.get_queryset()
-        contenttype = ContentType.objects.get(
-            app_label=kwargs["ref"]._meta.app_label,
-            model=kwargs["ref"]._meta.model_name,
+        contenttype = ContentType.objects.get_for_model(kwargs["ref"])
+        date = datetime.combine(
+            kwargs["date"],
+            django_timezone.now().time(),
+            timezone.utc if settings.USE_TZ else None,
         )
-        defaults = {
-            "ref_type": contenttype,
-            "ref_id": kwargs["ref"].id,
-            "ref": kwargs["ref"],
-            "date": datetime.combine(
-                kwargs["date"],
-                django_timezone.now().time(),
-                timezone.utc if settings.USE_TZ else None,
-            ),
-            "name": kwargs["name"],
-            "note": kwargs["note"],
-        }
+        transactions = [
+            self.model(
+                ref_type=contenttype,
+                ref_id=kwargs["ref"].id,
+                date=date,
+                name=record.get("name", kwargs["name"]),
+                note=kwargs["note"],
+                account=accounts[record["account_code"]],
+                type=record["type"],
+                amount=self._to_amount(record["amount"]),
+            )
+            for record in records
+        ]
 
         with transaction.atomic():
-            # delete existing records
-            queryset.filter(ref_type=contenttype, ref_id=kwargs["ref"].id).delete()
-            try:
-                for record in kwargs["transactions"]:
-                    _defaults = {
-                        **defaults,
-                        "name": (
-                            record["name"] if "name" in record else defaults["name"]
-                        ),
-                    }
-                    queryset.create(
-                        account=account_model.actives.get(code=record["account_code"]),
-                        type=record["type"],
-                        amount=record["amount"],
-                        **_defaults,
-                    )
-            except MultipleObjectsReturned:
-                raise ValidationError(
-                    "Multiple transactions/accounts found with the same reference."
-                )
-            except account_model.DoesNotExist:
-                raise ValidationError("Account provided was not found or is archived.")
+            self._sync_records(
+                queryset.filter(ref_type=contenttype, ref_id=kwargs["ref"].id),
+                transactions,
+            )
+
+    def _sync_records(self, queryset, transactions):
+        """
+        Make the recorded rows in `queryset` match `transactions`,
+        writing only the rows that changed.
+
+        Rows are matched on account, type & name. A matched row keeps its
+        timestamp if it still falls on the same date, so re-posting an
+        unchanged resource issues no writes at all.
+        """
+        existing = defaultdict(list)
+        for record in queryset.select_for_update():
+            existing[(record.account_id, record.type, record.name)].append(record)
+
+        to_create, to_update, updated_fields, to_delete, balance_deltas = (
+            self._plan_records(existing, transactions)
+        )
+
+        if to_create:
+            self.bulk_create(to_create)
+        if to_update:
+            self.bulk_update(to_update, sorted(updated_fields))
+        if to_delete:
+            queryset.filter(id__in=[record.id for record in to_delete]).delete()
+        self._apply_balance_deltas(balance_deltas)
+
+    def _plan_records(self, existing, transactions):
+        """
+        Diff `transactions` against the `existing` rows, grouped by
+        (account, type, name). Return the rows to create, update (with the
+        fields that changed) & delete, and the resulting balance deltas.
+        """
+        to_create, to_update, updated_fields = [], [], set()
+        balance_deltas = defaultdict(int)
+        for record in transactions:
+            matches = existing.get((record.account_id, record.type, record.name))
+            if not matches:
+                to_create.append(record)
+                balance_deltas[(record.account_id, record.date.date())] += record.amount
+                continue
+
+            current = matches.pop(0)
+            changed_fields = [
+                field
+                for field in ("amount", "note")
+                if getattr(current, field) != getattr(record, field)
+            ]
+            if current.date.date() != record.date.date():
+                changed_fields.append("date")
+            if not changed_fields:
+                continue
+
+            balance_deltas[(current.account_id, current.date.date())] -= current.amount
+            balance_deltas[(record.account_id, record.date.date())] += record.amount
+            for field in changed_fields:
+                setattr(current, field, getattr(record, field))
+            to_update.append(current)
+            updated_fields.update(changed_fields)
+
+        to_delete = [record for records in existing.values() for record in records]
+        for record in to_delete:
+            balance_deltas[(record.account_id, record.date.date())] -= record.amount
+        return to_create, to_update, updated_fields, to_delete, balance_deltas
+
+    def _check_balanced(self, records):
+        total_debit = 0
+        total_credit = 0
+        for record in records:
+            if record["type"] == "debit":
+                total_debit += abs(record["amount"])
+            else:
+                total_credit += abs(record["amount"])
+        if self._to_amount(total_debit) != self._to_amount(total_credit):
+            raise ValidationError("Transaction not balanced!")
+
+    def _to_amount(self, value):
+        """
+        Round `value` the same way the db rounds
+        the `amount` column on the way in.
+        """
+        return Decimal(str(value)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+    def _delete_records(self, queryset):
+        """
+        Delete transaction records and reverse
+        their amounts on the running balances.
+        """
+        balance_deltas = defaultdict(int)
+        for account_id, date, amount in queryset.values_list(
+            "account_id", "date", "amount"
+        ):
+            balance_deltas[(account_id, date.date())] -= amount
+        queryset.delete()
+        self._apply_balance_deltas(balance_deltas)
+
+    def _apply_balance_deltas(self, balance_deltas):
+        """
+        Apply `balance_deltas` ({(account_id, date): amount}) to the
+        running balances & to the balance snapshots on or after the date.
+        """
+        account_deltas = defaultdict(int)
+        for (account_id, _date), amount in balance_deltas.items():
+            account_deltas[account_id] += amount
+        AccountBalance = apps.get_model("accounting.AccountBalance")
+        AccountBalance.objects.apply_deltas(account_deltas)
+        AccountBalanceSnapshot = apps.get_model("accounting.AccountBalanceSnapshot")
+        AccountBalanceSnapshot.objects.apply_deltas(balance_deltas)
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.18 on 2026-10-18 05:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def seed_balances(apps, schema_editor):
+    AccountBalance = apps.get_model("accounting", "AccountBalance")
+    Transaction = apps.get_model("accounting", "Transaction")
+    AccountBalance.objects.bulk_create(
+        [
+            AccountBalance(account_id=row["account_id"], amount=row["total"])
+            for row in Transaction.objects.order_by()
+            .values("account_id")
+            .annotate(total=models.Sum("amount"))
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounting", "0003_alter_account_options_account_order_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountBalance",
+            fields=[
+                (
+                    "account",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="balance",
+                        serialize=False,
+                        to="accounting.account",
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=17),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_balances, migrations.RunPython.noop),
+    ]
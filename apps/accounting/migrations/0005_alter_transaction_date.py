@@ -0,0 +1,19 @@
+# Generated by Django 4.2.18 on 2026-10-18 05:39
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounting", "0004_accountbalance"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="transaction",
+            name="date",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
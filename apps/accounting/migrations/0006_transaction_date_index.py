@@ -0,0 +1,17 @@
+# Generated by Django 4.2.18 on 2026-10-18 05:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounting", "0005_alter_transaction_date"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["date"], name="accounting__date_98b3df_idx"),
+        ),
+    ]
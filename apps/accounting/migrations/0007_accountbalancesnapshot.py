@@ -0,0 +1,50 @@
+# Generated by Django 4.2.18 on 2026-10-18 05:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounting", "0006_transaction_date_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountBalanceSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=17),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_snapshots",
+                        to="accounting.account",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="accountbalancesnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("account", "date"), name="unique_account_snapshot_date"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.18 on 2026-10-18 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounting", "0007_accountbalancesnapshot"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["account", "date", "id"], name="accounting__account_8468a7_idx"
+            ),
+        ),
+    ]
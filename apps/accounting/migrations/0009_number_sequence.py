@@ -0,0 +1,13 @@
+from django.db import migrations
+from core.utils import create_number_sequence
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounting", "0008_transaction_account_date_index"),
+    ]
+
+    operations = [
+        create_number_sequence("JNL", "accounting_journalentry"),
+    ]
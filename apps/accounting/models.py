@@ -1,13 +1,19 @@
 from django.db import models
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 from core.utils import get_next_number
-from .managers import ActiveAccountManager, TransactionManager
+from .managers import (
+    AccountBalanceManager,
+    AccountBalanceSnapshotManager,
+    ActiveAccountManager,
+    TransactionManager,
+)
 
 
 def get_journal_next_number():
-    return get_next_number(JournalEntry, JournalEntry.NUMBER_PREFIX)
+    return get_next_number(JournalEntry.NUMBER_PREFIX)
 
 
 class AccountType(models.TextChoices):
@@ -104,6 +110,59 @@ class Account(models.Model):
         return Account.objects.filter(sub_type=self.sub_type).exclude(id=self.id)
 
 
+class AccountBalance(models.Model):
+    """
+    Running balance of an account.
+
+    This is kept in step with the account's transactions as they
+    are recorded or deleted, so that balances can be read without
+    aggregating the whole transactions table.
+    """
+
+    account = models.OneToOneField(
+        Account,
+        primary_key=True,
+        related_name="balance",
+        on_delete=models.CASCADE,
+    )
+    amount = models.DecimalField(max_digits=17, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = AccountBalanceManager()
+
+    def __str__(self) -> str:
+        return f"{self.account} --> {self.amount}"
+
+
+class AccountBalanceSnapshot(models.Model):
+    """
+    Closing balance of an account at the end of a day.
+
+    Snapshots are taken daily and adjusted whenever a transaction
+    dated on or before them is recorded, edited or deleted. Reports
+    read the nearest snapshot and add the transactions after it.
+    """
+
+    account = models.ForeignKey(
+        Account, related_name="balance_snapshots", on_delete=models.CASCADE
+    )
+    date = models.DateField()
+    amount = models.DecimalField(max_digits=17, decimal_places=2, default=0)
+
+    objects = AccountBalanceSnapshotManager()
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "date"], name="unique_account_snapshot_date"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.account}/{self.date} --> {self.amount}"
+
+
 class TransactionType(models.TextChoices):
     DEBIT = (
         "debit",
@@ -124,7 +183,7 @@ class Transaction(models.Model):
 
     name = models.CharField(max_length=50)
     note = models.TextField()
-    date = models.DateTimeField(auto_now_add=True)
+    date = models.DateTimeField(default=timezone.now)
     account = models.ForeignKey(
         "accounting.Account", related_name="transactions", on_delete=models.PROTECT
     )
@@ -134,7 +193,11 @@ class Transaction(models.Model):
     objects = TransactionManager()
 
     class Meta:
-        indexes = [models.Index(fields=["ref_type", "ref_id", "date"])]
+        indexes = [
+            models.Index(fields=["ref_type", "ref_id", "date"]),
+            models.Index(fields=["date"]),
+            models.Index(fields=["account", "date", "id"]),
+        ]
         ordering = ["-date"]
 
     def __str__(self) -> str:
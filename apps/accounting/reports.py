@@ -0,0 +1,277 @@
+"""
+Accounting reports computed from the ledger.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone
+from django.conf import settings
+from django.db.models import DecimalField, F, Q, RowRange, Sum, Value, Window
+from django.db.models.functions import Abs
+from apps.accounting import cache
+from apps.accounting.models import (
+    AccountBalanceSnapshot,
+    AccountType,
+    Transaction,
+    TransactionType,
+)
+
+
+def day_start(day):
+    """
+    Return the first moment of `day` as stored in `Transaction.date`.
+    """
+    return datetime.combine(day, time.min, timezone.utc if settings.USE_TZ else None)
+
+
+def filter_by_date(queryset, start=None, end=None):
+    """
+    Filter transactions that fall between the `start` & `end` dates (inclusive),
+    comparing against day boundaries so an index on `date` can be used.
+    """
+    if start is not None:
+        queryset = queryset.filter(date__gte=day_start(start))
+    if end is not None:
+        queryset = queryset.filter(date__lt=day_start(end + timedelta(days=1)))
+    return queryset
+
+
+def trial_balance(start=None, end=None):
+    """
+    Return debit & credit totals per account for the period.
+
+    The totals of every account are calculated in one grouped query and
+    then rolled up into their parent accounts. Grand totals are taken
+    from top level accounts only, so sub accounts aren't counted twice.
+    """
+    rows = (
+        filter_by_date(Transaction.objects.order_by(), start, end)
+        .values("account_id")
+        .annotate(
+            debit=Sum(Abs("amount"), filter=Q(type=TransactionType.DEBIT), default=0),
+            credit=Sum(Abs("amount"), filter=Q(type=TransactionType.CREDIT), default=0),
+        )
+    )
+
+    chart = cache.get_chart()
+    totals = defaultdict(lambda: {"debit": 0, "credit": 0})
+    for row in rows:
+        account = chart.get_account(row["account_id"])
+        while account is not None:
+            totals[account.id]["debit"] += row["debit"]
+            totals[account.id]["credit"] += row["credit"]
+            account = chart.get_account(account.parent_id)
+
+    accounts = sorted(
+        (chart.get_account(account_id) for account_id in totals),
+        key=lambda account: (account.order, account.code),
+    )
+    top_level = [account for account in accounts if account.parent_id is None]
+    return {
+        "from": start,
+        "to": end,
+        "accounts": [
+            {
+                "id": account.id,
+                "code": account.code,
+                "name": account.name,
+                "type": account.type,
+                "parent": account.parent_id,
+                **totals[account.id],
+            }
+            for account in accounts
+        ],
+        "total": {
+            "debit": sum(totals[account.id]["debit"] for account in top_level),
+            "credit": sum(totals[account.id]["credit"] for account in top_level),
+        },
+    }
+
+
+def balances_as_of(date, account_ids=None):
+    """
+    Return the closing balance of every account (or of `account_ids`)
+    as of `date`.
+    returns {account_id: amount}
+
+    Balances start from the latest snapshot of each account taken on
+    or before `date`, plus the transactions recorded after it, all
+    summed in one grouped query.
+    """
+    snapshots = AccountBalanceSnapshot.objects.filter(date__lte=date)
+    transactions = filter_by_date(Transaction.objects.order_by(), end=date)
+    if account_ids is not None:
+        snapshots = snapshots.filter(account_id__in=account_ids)
+        transactions = transactions.filter(account_id__in=account_ids)
+    snapshots = (
+        snapshots.order_by("account_id", "-date")
+        .distinct("account_id")
+        .values_list("account_id", "date", "amount")
+    )
+    balances = defaultdict(int)
+    accounts_by_snapshot_date = defaultdict(list)
+    for account_id, snapshot_date, amount in snapshots:
+        balances[account_id] = amount
+        accounts_by_snapshot_date[snapshot_date].append(account_id)
+
+    # accounts without a snapshot are summed from the beginning
+    since_snapshot = ~Q(account_id__in=list(balances))
+    for snapshot_date, account_ids in accounts_by_snapshot_date.items():
+        since_snapshot |= Q(
+            account_id__in=account_ids,
+            date__gte=day_start(snapshot_date + timedelta(days=1)),
+        )
+    rows = (
+        transactions.filter(since_snapshot)
+        .values("account_id")
+        .annotate(total=Sum("amount"))
+    )
+    for row in rows:
+        balances[row["account_id"]] += row["total"]
+    return balances
+
+
+def general_ledger(account, start=None, end=None):
+    """
+    Return the transactions of `account` between the `start` & `end` dates
+    (inclusive) with a running balance, seeded from the opening balance.
+
+    The running balance is a `SUM() OVER (ORDER BY date, id)` window in the
+    same query as the rows, which are read through a server side cursor
+    so a ledger of any length can be streamed (see `core.streaming`).
+    """
+    opening_balance = 0
+    if start is not None:
+        opening_balance = balances_as_of(start - timedelta(days=1), [account.id])[
+            account.id
+        ]
+    running_balance = Window(
+        Sum("amount"),
+        order_by=[F("date").asc(), F("id").asc()],
+        frame=RowRange(start=None, end=0),
+    ) + Value(opening_balance, output_field=DecimalField())
+    rows = (
+        filter_by_date(account.transactions.all(), start, end)
+        .order_by("date", "id")
+        .annotate(balance=running_balance, ref_model=F("ref_type__model"))
+        .values(
+            "id", "date", "name", "note", "type", "amount", "ref_model", "ref_id", "balance"
+        )
+        .iterator(chunk_size=2000)
+    )
+
+    closing_balance = opening_balance
+
+    def transactions():
+        nonlocal closing_balance
+        for row in rows:
+            closing_balance = row["balance"]
+            yield row
+
+    return {
+        "account": {"id": account.id, "code": account.code, "name": account.name},
+        "from": start,
+        "to": end,
+        "opening_balance": opening_balance,
+        "transactions": transactions(),
+        "closing_balance": lambda: closing_balance,
+    }
+
+
+def balance_sheet(date):
+    """
+    Return asset, liability & equity account balances as of `date`,
+    grouped by account type & sub type.
+
+    Income less expenses to date is reported as net income under equity,
+    so that assets equal liabilities plus equity.
+    """
+    balances = balances_as_of(date)
+    report = _group_balances(
+        balances, [AccountType.ASSET, AccountType.LIABILITY, AccountType.EQUITY]
+    )
+    net_income = _total_for_type(balances, AccountType.INCOME) - _total_for_type(
+        balances, AccountType.EXPENSE
+    )
+    report[AccountType.EQUITY]["total"] += net_income
+    return {
+        "date": date,
+        **report,
+        "net_income": net_income,
+        "total_liabilities_and_equity": report[AccountType.LIABILITY]["total"]
+        + report[AccountType.EQUITY]["total"],
+    }
+
+
+def income_statement(start, end):
+    """
+    Return income & expense account activity between the `start` & `end`
+    dates (inclusive), grouped by account type & sub type.
+    """
+    closing = balances_as_of(end)
+    opening = balances_as_of(start - timedelta(days=1))
+    balances = {
+        account_id: amount - opening.get(account_id, 0)
+        for account_id, amount in closing.items()
+    }
+    report = _group_balances(balances, [AccountType.INCOME, AccountType.EXPENSE])
+    return {
+        "from": start,
+        "to": end,
+        **report,
+        "net_income": report[AccountType.INCOME]["total"]
+        - report[AccountType.EXPENSE]["total"],
+    }
+
+
+def _total_for_type(balances, account_type):
+    chart = cache.get_chart()
+    return sum(
+        amount
+        for account_id, amount in balances.items()
+        if chart.get_account(account_id).type == account_type
+    )
+
+
+def _group_balances(balances, account_types):
+    """
+    Group account balances by account type & then sub type.
+
+    e.g:
+    "asset": {
+        "total": 5000,
+        "sub_types": [
+            {
+                "id": 1,
+                "name": "Cash & Bank",
+                "total": 5000,
+                "accounts": [
+                    {"id": 3, "code": "1000-1", "name": "Petty Cash", "balance": 5000}
+                ]
+            }
+        ]
+    }
+    """
+    chart = cache.get_chart()
+    report = {account_type: {"total": 0, "sub_types": []} for account_type in account_types}
+    sub_types = {}
+    for account in sorted(
+        chart.get_accounts(), key=lambda account: (account.order, account.code)
+    ):
+        amount = balances.get(account.id, 0)
+        if account.type not in report or not amount:
+            continue
+        if account.sub_type_id not in sub_types:
+            sub_types[account.sub_type_id] = {
+                "id": account.sub_type_id,
+                "name": account.sub_type.name,
+                "total": 0,
+                "accounts": [],
+            }
+            report[account.type]["sub_types"].append(sub_types[account.sub_type_id])
+        sub_type = sub_types[account.sub_type_id]
+        sub_type["accounts"].append(
+            {"id": account.id, "code": account.code, "name": account.name, "balance": amount}
+        )
+        sub_type["total"] += amount
+        report[account.type]["total"] += amount
+    return report
@@ -1,5 +1,6 @@
 from django.db import transaction
 from rest_framework import serializers
+from apps.accounting import cache
 from apps.accounting.models import (
     Account,
     AccountSubType,
@@ -26,8 +27,51 @@ class AccountShallowSerializer(serializers.ModelSerializer):
         fields = ("id", "name")
 
 
+class ChartOfAccountsField(PrimaryKey_To_ObjectField):
+    """
+    PrimaryKey_To_ObjectField for accounts & account sub types that
+    reads them from the cached chart of accounts instead of the db.
+
+    Pass `active_only=True` to reject archived accounts.
+    """
+
+    batch_resolve = False
+
+    def __init__(self, **kwargs):
+        self.active_only = kwargs.pop("active_only", False)
+        super().__init__(**kwargs)
+
+    def get_cached_object(self, pk):
+        if self.queryset.model is Account:
+            return cache.get_account(pk, self.active_only)
+        return cache.get_sub_type(pk)
+
+    def get_attribute(self, instance):
+        if len(self.source_attrs) == 1 and not self.read_source:
+            field = instance._meta.get_field(self.source_attrs[0])
+            pk = getattr(instance, field.attname)
+            if pk is None:
+                return None
+            cached_object = self.get_cached_object(pk)
+            if cached_object is not None:
+                return cached_object
+        return super().get_attribute(instance)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        cached_object = self.get_cached_object(pk)
+        if cached_object is None:
+            self.fail("does_not_exist", pk_value=data)
+        return cached_object
+
+
 class AccountSerializer(serializers.ModelSerializer):
-    sub_type = PrimaryKey_To_ObjectField(
+    sub_type = ChartOfAccountsField(
         queryset=AccountSubType.objects.all(),
         object_serializer=AccountSubTypeSerializer,
     )
@@ -70,6 +114,23 @@ class AccountSiblingsSerializer(serializers.ModelSerializer):
         return repr
 
 
+class DateRangeSerializer(serializers.Serializer):
+    """
+    Validate the optional `from` & `to` date query params of reports.
+    """
+
+    def get_fields(self):
+        return {
+            "from": serializers.DateField(required=False),
+            "to": serializers.DateField(required=False),
+        }
+
+    def validate(self, attrs):
+        if attrs.get("from") and attrs.get("to") and attrs["from"] > attrs["to"]:
+            raise serializers.ValidationError("`from` date must be before `to` date.")
+        return attrs
+
+
 class TransactionSerializer(serializers.ModelSerializer):
     account = serializers.SlugRelatedField(slug_field="name", read_only=True)
     ref_type = serializers.SlugRelatedField(slug_field="model", read_only=True)
@@ -81,8 +142,10 @@ class TransactionSerializer(serializers.ModelSerializer):
 
 class JournalEntryLineSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(required=False)
-    account = PrimaryKey_To_ObjectField(
-        queryset=Account.actives, object_serializer=AccountShallowSerializer
+    account = ChartOfAccountsField(
+        queryset=Account.actives,
+        object_serializer=AccountShallowSerializer,
+        active_only=True,
     )
 
     class Meta:
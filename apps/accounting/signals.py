@@ -0,0 +1,20 @@
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.accounting.cache import clear_chart
+from apps.accounting.models import Account, AccountSubType
+from core.cache import connect_cache_invalidation
+
+connect_cache_invalidation(Account, AccountSubType)
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=AccountSubType)
+@receiver(post_delete, sender=AccountSubType)
+def invalidate_chart_of_accounts(sender, **kwargs):
+    # cleared again on commit, in case a copy of the chart was loaded
+    # by another request before the change was committed
+    schema_name = connection.schema_name
+    clear_chart(schema_name)
+    transaction.on_commit(lambda: clear_chart(schema_name))
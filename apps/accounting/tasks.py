@@ -0,0 +1,26 @@
+from datetime import timedelta
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.utils import timezone
+from django_tenants.utils import (
+    get_public_schema_name,
+    get_tenant_model,
+    schema_context,
+)
+from apps.accounting.models import AccountBalanceSnapshot
+
+logging = get_task_logger(__name__)
+
+
+@shared_task
+def take_balance_snapshots():
+    """
+    Store yesterday's closing account balances for every tenant.
+    """
+    # in TIME_ZONE like the transaction dates, not the OS time zone
+    snapshot_date = timezone.localdate() - timedelta(days=1)
+    tenants = get_tenant_model().objects.exclude(schema_name=get_public_schema_name())
+    for schema_name in tenants.values_list("schema_name", flat=True):
+        with schema_context(schema_name):
+            AccountBalanceSnapshot.objects.take(snapshot_date)
+        logging.info("Balance snapshots for %s taken as of %s", schema_name, snapshot_date)
@@ -1,4 +1,6 @@
-from django.db.models import Sum
+from datetime import date
+from django.db.models import F
+from django.http import StreamingHttpResponse
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
@@ -9,24 +11,40 @@ from apps.accounting.models import (
     JournalEntry,
     Transaction,
 )
+from apps.accounting import reports
+from core.cache import CachedResponseMixin, cache_response
+from core.conditional import ConditionalGetMixin
+from core.pagination import KeysetPagination
+from core.streaming import export_response, iter_json
 from apps.accounting.serializers import (
     AccountSerializer,
     AccountSiblingsSerializer,
     AccountSubTypeSerializer,
+    DateRangeSerializer,
     JournalEntrySerializer,
     TransactionSerializer,
 )
 
 
-class AccountViewSet(ModelViewSet):
+class AccountViewSet(ConditionalGetMixin, CachedResponseMixin, ModelViewSet):
     queryset = Account.objects.all()
     serializer_class = AccountSerializer
+    cache_models = (Account, AccountSubType)
+    conditional_models = (AccountSubType,)
 
     def get_serializer_class(self):
         if self.action == "siblings":
             return AccountSiblingsSerializer
         if self.action == "transactions":
             return TransactionSerializer
+        if self.action in [
+            "ledger",
+            "export_transactions",
+            "trial_balance",
+            "balance_sheet",
+            "income_statement",
+        ]:
+            return None
         return self.serializer_class
 
     def destroy(self, request, *args, **kwargs):
@@ -46,20 +64,65 @@ class AccountViewSet(ModelViewSet):
 
     @action(["get"], detail=True)
     def transactions(self, request, *args, **kwargs):
-        insance = self.get_object()
-        serializer = self.get_serializer(insance.transactions.all(), many=True)
-        return Response(serializer.data)
+        instance = self.get_object()
+        date_range = self.get_date_range(request)
+        queryset = reports.filter_by_date(
+            instance.transactions.select_related("account", "ref_type"),
+            date_range.get("from"),
+            date_range.get("to"),
+        )
+        # newest first, paged on (date, id) so deep pages stay cheap
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(["get"], detail=True)
+    def ledger(self, request, *args, **kwargs):
+        instance = self.get_object()
+        date_range = self.get_date_range(request)
+        ledger = reports.general_ledger(
+            instance, date_range.get("from"), date_range.get("to")
+        )
+        return StreamingHttpResponse(iter_json(ledger), content_type="application/json")
+
+    @action(["get"], detail=False, url_path="transactions/export")
+    def export_transactions(self, request, *args, **kwargs):
+        date_range = self.get_date_range(request)
+        queryset = reports.filter_by_date(
+            Transaction.objects.order_by("date", "id"),
+            date_range.get("from"),
+            date_range.get("to"),
+        )
+        return export_response(
+            request,
+            queryset,
+            {
+                "id": "id",
+                "date": "date",
+                "account_code": "account__code",
+                "account": "account__name",
+                "name": "name",
+                "note": "note",
+                "type": "type",
+                "amount": "amount",
+                "ref_type": "ref_type__model",
+                "ref_id": "ref_id",
+            },
+            "transactions",
+        )
 
     @action(["get"], detail=False)
+    @cache_response
     def subtypes(self, request, *args, **kwargs):
         serializer = AccountSubTypeSerializer(AccountSubType.objects.all(), many=True)
         return Response(serializer.data)
 
     @action(["get"], detail=False)
     def balance(self, request, *args, **kwargs):
-        accounts = Account.actives.values(
-            "id", bal=Sum("transactions__amount", default=0)
-        )
+        # balances are maintained as transactions are recorded
+        # see `AccountBalanceManager.apply_deltas`
+        accounts = Account.actives.values("id", bal=F("balance__amount"))
         return Response(
             {
                 account["id"]: account["bal"] if account["bal"] else 0
@@ -67,6 +130,28 @@ class AccountViewSet(ModelViewSet):
             }
         )
 
+    @action(["get"], detail=False, url_path="trial-balance")
+    def trial_balance(self, request, *args, **kwargs):
+        date_range = self.get_date_range(request)
+        return Response(reports.trial_balance(date_range.get("from"), date_range.get("to")))
+
+    @action(["get"], detail=False, url_path="balance-sheet")
+    def balance_sheet(self, request, *args, **kwargs):
+        date_range = self.get_date_range(request)
+        return Response(reports.balance_sheet(date_range.get("to", date.today())))
+
+    @action(["get"], detail=False, url_path="income-statement")
+    def income_statement(self, request, *args, **kwargs):
+        date_range = self.get_date_range(request)
+        end = date_range.get("to", date.today())
+        start = date_range.get("from", end.replace(month=1, day=1))
+        return Response(reports.income_statement(start, end))
+
+    def get_date_range(self, request):
+        serializer = DateRangeSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
 
 class JournalEntryViewSet(ModelViewSet):
     queryset = JournalEntry.objects
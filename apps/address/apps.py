@@ -7,3 +7,8 @@ class AddressConfig(AppConfig):
     label = "address"
     name = "apps.address"
     verbose_name = _("Address")
+
+    def ready(self):
+        from core.cache import connect_cache_invalidation
+
+        connect_cache_invalidation(self.get_model("Address"))
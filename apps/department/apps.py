@@ -7,3 +7,8 @@ class DepartmentConfig(AppConfig):
     label = "department"
     name = "apps.department"
     verbose_name = _("Department")
+
+    def ready(self):
+        from core.cache import connect_cache_invalidation
+
+        connect_cache_invalidation(self.get_model("Department"))
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import Permission
 from django.conf import settings
+from django.utils.functional import cached_property
 from rest_framework import serializers
 from .models import Department
 from core.serializers.fields import PrimaryKey_To_ObjectField
@@ -34,6 +35,7 @@ class DepartmentSerializer(serializers.ModelSerializer):
         We override the default members repr. to use actual User objects
         instead of UserTenantPermissions
         """
+        # `user_set` & `permissions` are prefetched by the view
         members = [user.profile for user in instance.user_set.all()]
         repr = super().to_representation(instance)
         repr["members"] = DepartmentMemberSerializer(members, many=True).data
@@ -53,6 +55,14 @@ class DepartmentSerializer(serializers.ModelSerializer):
         instance = super().create(validated_data)
         return instance
 
+    @cached_property
+    def _categories_by_model(self):
+        categories_by_model = {}
+        for category, models in settings.PERMISSION_CATEGORIES.items():
+            for model in models:
+                categories_by_model.setdefault(model, []).append(category)
+        return categories_by_model
+
     def _get_perms_data(self, instance):
         """
         Return all dept. permissions but, categorised by predefined
@@ -70,20 +80,13 @@ class DepartmentSerializer(serializers.ModelSerializer):
         }
         """
 
-        perms_categories = settings.PERMISSION_CATEGORIES
         perms_by_categories = {}
-        for perm in instance.permissions.select_related("content_type"):
+        for perm in instance.permissions.all():
             perm_model = perm.content_type.name
             perm_dict = {"id": perm.id, "name": perm.name, "codename": perm.codename}
-            for category, models in perms_categories.items():
-                if perm_model not in models:
-                    continue
-                if category not in perms_by_categories:
-                    perms_by_categories[category] = {}
-                if perm_model in perms_by_categories[category]:
-                    perms_by_categories[category][perm_model].append(perm_dict)
-                else:
-                    perms_by_categories[category][perm_model] = [perm_dict]
+            for category in self._categories_by_model.get(perm_model, []):
+                category_perms = perms_by_categories.setdefault(category, {})
+                category_perms.setdefault(perm_model, []).append(perm_dict)
         return perms_by_categories
 
 
@@ -1,9 +1,12 @@
+from django.contrib.auth.models import Permission
+from django.db.models import Prefetch
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.permissions import DjangoModelPermissions
 
+from tenant_users.permissions.models import UserTenantPermissions
 from apps.user.serializers import PermissionSerializer
 from .models import Department
 from .serializers import (
@@ -58,6 +61,23 @@ class DepartmentViewSet(ModelViewSet):
             self.permission_classes = [BelongsToOrganisation, DjangoModelPermissions]
         return super().get_permissions()
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ["list", "retrieve"]:
+            # members, heads & permissions of a whole page in 3 queries
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "user_set",
+                    queryset=UserTenantPermissions.objects.select_related("profile"),
+                ),
+                Prefetch(
+                    "permissions",
+                    queryset=Permission.objects.select_related("content_type"),
+                ),
+                "heads",
+            )
+        return queryset
+
     def check_object_permissions(self, request, obj):
         """
         Only mgt. users can update dept. permissions.
@@ -102,8 +122,9 @@ class DepartmentViewSet(ModelViewSet):
     @action(methods=["get"], detail=True)
     def non_members(self, request, pk=None):
         instance = self.get_object()
-        members = instance.user_set.values_list("profile__id", flat=True)
-        non_members = request.tenant.user_set.exclude(id__in=members)
+        non_members = request.tenant.user_set.exclude(
+            usertenantpermissions__groups=instance
+        )
         serializer = DepartmentMemberSerializer(non_members, many=True)
         return Response(serializer.data)
 
@@ -7,3 +7,8 @@ class ItemConfig(AppConfig):
     label = "item"
     name = "apps.inventory.item"
     verbose_name = _("Inventory Item")
+
+    def ready(self):
+        from core.cache import connect_cache_invalidation
+
+        connect_cache_invalidation(self.get_model("Item"))
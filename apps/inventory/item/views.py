@@ -4,26 +4,30 @@ from rest_framework import filters
 from apps.inventory.item.models import Item
 from apps.inventory.item.serializers import ItemSerializer
 from django_filters.rest_framework import DjangoFilterBackend
+from core.cache import CachedResponseMixin
 
 
-class ItemViewSet(ModelViewSet):
+class ItemViewSet(CachedResponseMixin, ModelViewSet):
     queryset = Item.objects.filter(type="goods")
     serializer_class = ItemSerializer
+    cache_models = (Item,)
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ["name"]
     filter_fields = ["is_active"]
 
 
-class ServiceViewSet(ModelViewSet):
+class ServiceViewSet(CachedResponseMixin, ModelViewSet):
     queryset = Item.objects.filter(type="service")
     serializer_class = ItemSerializer
+    cache_models = (Item,)
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ["name"]
     filter_fields = ["is_active"]
 
 
-class ItemsAndServicesList(ListAPIView):
+class ItemsAndServicesList(CachedResponseMixin, ListAPIView):
     queryset = Item.objects.filter(is_active=True)
     serializer_class = ItemSerializer
+    cache_models = (Item,)
     filter_backends = [filters.SearchFilter]
     search_fields = ["name"]
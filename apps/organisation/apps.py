@@ -7,3 +7,6 @@ class OrganisationConfig(AppConfig):
     label = "organisation"
     name = "apps.organisation"
     verbose_name = _("Organisation")
+
+    def ready(self):
+        from apps.organisation import signals  # noqa: F401
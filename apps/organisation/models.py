@@ -12,6 +12,7 @@ from django_tenants.models import DomainMixin
 from apps.accounting.factory import AccountingFactory
 from apps.user.models import User
 from core.abstract_models import AbstractAddress
+from core.middleware import clear_cached_tenants
 
 
 class Tenant(TenantBase):
@@ -140,7 +141,10 @@ class Organisation(models.Model):
             tenant_domain = tenant_slug
         else:
             tenant_domain = f"{tenant_slug}.{settings.TENANT_USERS_DOMAIN}"
-        Domain.objects.filter(tenant=self.tenant).update(domain=tenant_domain)
+        domains = Domain.objects.filter(tenant=self.tenant)
+        previous_domains = list(domains.values_list("domain", flat=True))
+        domains.update(domain=tenant_domain)
+        clear_cached_tenants(*previous_domains, tenant_domain)
 
     def _add_all_meta_users(self):
         meta_users = User.objects.filter(role=User.META)
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.organisation.models import Domain
+from core.middleware import clear_cached_tenants
+
+
+@receiver(post_save, sender=Domain)
+@receiver(post_delete, sender=Domain)
+def invalidate_cached_tenant(sender, instance, **kwargs):
+    # a new domain may be cached as unknown, a deleted one as existing
+    clear_cached_tenants(instance.domain)
@@ -7,3 +7,6 @@ class BillConfig(AppConfig):
     label = "bill"
     name = "apps.purchase.bill"
     verbose_name = _("Bill")
+
+    def ready(self):
+        from apps.purchase.bill import signals  # noqa: F401
@@ -1,24 +1,132 @@
+from decimal import Decimal
+from django.apps import apps
 from django.db import models
+from django.db.models import Case, Count, F, OuterRef, Q, Sum, Value, When
+from django.db.models.functions import Now, Round
+from django.db.models.lookups import Exact, GreaterThan
+from django.utils import timezone
+from core.utils import sum_subquery
 
 
-class BillManager(models.Manager):
+class BillQuerySet(models.QuerySet):
+    def _totals(self):
+        BillLine = apps.get_model("bill.BillLine")
+        PaymentMade = apps.get_model("bill.PaymentMade")
+        total_excl_tax = sum_subquery(
+            BillLine.objects.filter(bill=OuterRef("pk")),
+            "bill",
+            F("rate") * F("quantity"),
+        )
+        taxes_total = sum_subquery(
+            BillLine.taxes.through.objects.filter(billline__bill=OuterRef("pk")),
+            "billline__bill",
+            F("tax__rate")
+            / Value(Decimal(100))
+            * F("billline__rate")
+            * F("billline__quantity"),
+        )
+        amount_paid = sum_subquery(
+            PaymentMade.objects.filter(bill=OuterRef("pk")), "bill", F("amount")
+        )
+        return {
+            "taxes_total": taxes_total,
+            "total_incl_tax": total_excl_tax + taxes_total,
+            "amount_paid": amount_paid,
+            "amount_due": total_excl_tax + taxes_total - amount_paid,
+        }
+
+    def with_totals(self):
+        """
+        Annotate the line, tax & payment totals and the amount due
+        of each bill as `computed_<total>`, calculated in the db with
+        correlated subqueries.
+        """
+        return self.annotate(
+            **{f"computed_{name}": total for name, total in self._totals().items()}
+        )
+
+    def _status(self, amount_due, amount_paid):
+        """
+        The status of bills as a db expression.
+        """
+        from apps.purchase.bill.models import BillStatus
+
+        return Case(
+            When(Exact(amount_due, 0), then=Value(BillStatus.PAID)),
+            When(
+                Q(is_draft=False, due_date__lt=timezone.localdate()),
+                then=Value(BillStatus.OVERDUE),
+            ),
+            When(GreaterThan(amount_paid, 0), then=Value(BillStatus.PARTLY_PAID)),
+            When(is_draft=True, then=Value(BillStatus.DRAFT)),
+            default=Value(BillStatus.OPEN),
+        )
+
+    def refresh_totals(self):
+        """
+        Recalculate & store the totals & status of every bill
+        in the queryset with a single UPDATE.
+        """
+        totals = self._totals()
+        return self.update(
+            **totals,
+            # rounded as the stored columns are, so the status matches
+            # the one `refresh_status` derives from them
+            status=self._status(
+                Round(totals["amount_due"], 2), Round(totals["amount_paid"], 2)
+            ),
+            updated_at=Now(),
+        )
+
+    def refresh_status(self):
+        """
+        Recalculate & store the status of every bill in the queryset
+        from its stored totals, with a single UPDATE.
+        """
+        return self.update(status=self._status(F("amount_due"), F("amount_paid")))
+
+    def mark_overdue(self):
+        """
+        Flag unpaid bills past their due date as overdue, with a single UPDATE.
+        """
+        from apps.purchase.bill.models import BillStatus
+
+        return (
+            self.filter(is_draft=False, due_date__lt=timezone.localdate())
+            .exclude(amount_due=0)
+            .exclude(status=BillStatus.OVERDUE)
+            .update(status=BillStatus.OVERDUE, updated_at=Now())
+        )
+
+    def out_of_sync(self):
+        """
+        Filter bills whose stored totals differ from their lines & payments.
+        """
+        differs = Q()
+        for name in self.model.TOTAL_FIELDS:
+            differs |= ~Q(**{name: Round(f"computed_{name}", 2)})
+        return self.with_totals().filter(differs)
+
+    def with_lines_count(self):
+        return self.annotate(lines_count=Count("lines"))
+
+
+class BillManager(models.Manager.from_queryset(BillQuerySet)):
     def get_outstanding(self):
         """
-        Calculate amount due for all unarchived bills.
+        Calculate amount due for all unarchived bills,
+        in one aggregate query.
         """
-        draft, overdue, total = 0, 0, 0
-        for bill in (
+        is_overdue = Q(is_draft=False, due_date__lt=timezone.localdate())
+        return (
             self.get_queryset()
             .filter(archived=False)
-            .prefetch_related("lines", "payments")
-        ):
-            if bill.is_draft:
-                draft += bill.amount_due
-                continue
-            if bill.is_overdue:
-                overdue += bill.amount_due
-            total += bill.amount_due
-        return {"draft": draft, "overdue": overdue, "total": total}
+            .aggregate(
+                draft=Sum("amount_due", filter=Q(is_draft=True), default=0),
+                overdue=Sum("amount_due", filter=is_overdue, default=0),
+                total=Sum("amount_due", filter=Q(is_draft=False), default=0),
+            )
+        )
 
 
 class PaymentMadeManager(models.Manager):
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.18 on 2026-10-18 06:01
+
+from decimal import Decimal
+from django.db import migrations, models
+from core.utils import sum_subquery
+
+
+def backfill_totals(apps, schema_editor):
+    Bill = apps.get_model("bill", "Bill")
+    BillLine = apps.get_model("bill", "BillLine")
+    PaymentMade = apps.get_model("bill", "PaymentMade")
+    total_excl_tax = sum_subquery(
+        BillLine.objects.filter(bill=models.OuterRef("pk")),
+        "bill",
+        models.F("rate") * models.F("quantity"),
+    )
+    taxes_total = sum_subquery(
+        BillLine.taxes.through.objects.filter(billline__bill=models.OuterRef("pk")),
+        "billline__bill",
+        models.F("tax__rate")
+        / models.Value(Decimal(100))
+        * models.F("billline__rate")
+        * models.F("billline__quantity"),
+    )
+    amount_paid = sum_subquery(
+        PaymentMade.objects.filter(bill=models.OuterRef("pk")),
+        "bill",
+        models.F("amount"),
+    )
+    Bill.objects.update(
+        taxes_total=taxes_total,
+        total_incl_tax=total_excl_tax + taxes_total,
+        amount_paid=amount_paid,
+        amount_due=total_excl_tax + taxes_total - amount_paid,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bill", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bill",
+            name="amount_due",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=26
+            ),
+        ),
+        migrations.AddField(
+            model_name="bill",
+            name="amount_paid",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=26
+            ),
+        ),
+        migrations.AddField(
+            model_name="bill",
+            name="taxes_total",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=26
+            ),
+        ),
+        migrations.AddField(
+            model_name="bill",
+            name="total_incl_tax",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=26
+            ),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,13 @@
+from django.db import migrations
+from core.utils import create_number_sequence
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bill", "0003_status"),
+    ]
+
+    operations = [
+        create_number_sequence("B", "bill_bill"),
+    ]
@@ -66,6 +66,7 @@ class BillSerializer(BaseBillSerializer):
         with transaction.atomic():
             instance = super().update(instance, validated_data)
             self.update_relation("lines", instance.lines, lines_data)
+            instance.refresh_totals()
             return instance
 
 
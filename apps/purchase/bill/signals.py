@@ -0,0 +1,59 @@
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.purchase.bill.models import Bill, BillLine, PaymentMade
+from apps.tax.models import Tax
+
+
+def _deletes_bill(origin):
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is Bill
+
+
+@receiver(post_save, sender=BillLine)
+@receiver(post_delete, sender=BillLine)
+@receiver(post_save, sender=PaymentMade)
+@receiver(post_delete, sender=PaymentMade)
+def refresh_bill_totals(sender, instance, origin=None, **kwargs):
+    if _deletes_bill(origin):
+        # deleted along with their bill, there are no totals left to refresh
+        return
+    if sender.bill.is_cached(instance) and instance.bill is not None:
+        # keep the bill in memory (& its cached values) in sync too
+        instance.bill.refresh_totals()
+    else:
+        Bill.objects.filter(pk=instance.bill_id).refresh_totals()
+
+
+@receiver(pre_save, sender=PaymentMade)
+def refresh_previous_bill_totals(sender, instance, **kwargs):
+    # a payment moved to another bill changes the totals of both
+    if instance.pk is None:
+        return
+    previous = PaymentMade.objects.filter(pk=instance.pk).values_list(
+        "bill_id", flat=True
+    )
+    Bill.objects.filter(pk__in=previous).exclude(pk=instance.bill_id).refresh_totals()
+
+
+@receiver(m2m_changed, sender=BillLine.taxes.through)
+def refresh_bill_totals_on_line_taxes(sender, instance, action, pk_set, **kwargs):
+    if isinstance(instance, BillLine):
+        if action in ["post_add", "post_remove", "post_clear"]:
+            Bill.objects.filter(pk=instance.bill_id).refresh_totals()
+    elif action == "pre_clear":
+        # `pk_set` is None on clear, so note the bills of the lines first
+        instance._cleared_bill_ids = list(
+            Bill.objects.filter(lines__taxes=instance).values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        bill_ids = instance.__dict__.pop("_cleared_bill_ids", [])
+        Bill.objects.filter(pk__in=bill_ids).refresh_totals()
+    elif action in ["post_add", "post_remove"]:
+        Bill.objects.filter(lines__in=pk_set).refresh_totals()
+
+
+@receiver(post_save, sender=Tax)
+def refresh_bill_totals_on_tax_rate(sender, instance, created, **kwargs):
+    if not created:
+        Bill.objects.filter(lines__taxes=instance).refresh_totals()
@@ -1,18 +1,66 @@
+from django.db.models import Count
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.response import Response
 from rest_framework import status
 from apps.purchase.bill.models import Bill, BillStatus, PaymentMade
 from apps.purchase.bill.serializers import BillSerializer, PaymentMadeSerializer
+from apps.purchase.vendor.models import Vendor
 from apps.accounting.models import Transaction
+from apps.address.models import Address
+from apps.inventory.item.models import Item
+from apps.tax.models import Tax
+from core.conditional import ConditionalGetMixin
+from core.streaming import ExportMixin
 
 
-class BillViewSet(ModelViewSet):
+class BillViewSet(ConditionalGetMixin, ExportMixin, ModelViewSet):
     queryset = Bill.objects.all()
     serializer_class = BillSerializer
+    conditional_models = (Vendor, Address, Item, Tax)
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ["status"]
+    ordering_fields = [
+        "number",
+        "bill_date",
+        "due_date",
+        "total_incl_tax",
+        "amount_paid",
+        "amount_due",
+        "created_at",
+    ]
+    export_fields = {
+        "id": "id",
+        "number": "number",
+        "vendor": "vendor__display_name",
+        "bill_date": "bill_date",
+        "due_date": "due_date",
+        "is_draft": "is_draft",
+        "discount_as_percent": "discount_as_percent",
+        "discount_value": "discount_value",
+        "total_incl_tax": "total_incl_tax",
+        "taxes_total": "taxes_total",
+        "amount_paid": "amount_paid",
+        "amount_due": "amount_due",
+        "archived": "archived",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ["list", "retrieve"]:
+            queryset = (
+                queryset.select_related("vendor__shipping_address")
+                .prefetch_related("lines__item", "lines__taxes")
+                .with_lines_count()
+            )
+        return queryset
 
     def get_serializer_class(self):
-        if self.action in ["move_to_draft", "mark_as_open"]:
+        if self.action in ["move_to_draft", "mark_as_open", "counts", "export"]:
             return None
         return self.serializer_class
 
@@ -36,8 +84,22 @@ class BillViewSet(ModelViewSet):
     def outstanding(self, request):
         return Response(Bill.objects.get_outstanding())
 
+    @action(["get"], detail=False)
+    def counts(self, request):
+        """
+        Number of unarchived bills in each status.
+        """
+        counts = dict.fromkeys(BillStatus.values, 0)
+        counts.update(
+            Bill.objects.filter(archived=False)
+            .order_by()
+            .values_list("status")
+            .annotate(Count("id"))
+        )
+        return Response(counts)
+
     def record_transaction(self, instance):
-        if instance.status is not BillStatus.DRAFT:
+        if instance.status != BillStatus.DRAFT:
             Transaction.objects.record_bill(instance)
 
 
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-18 06:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expense", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="expense",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -26,6 +26,7 @@ class Expense(models.Model):
     date = models.DateField(default=date.today)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = ExpenseManager()
 
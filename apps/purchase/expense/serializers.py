@@ -2,7 +2,10 @@ from rest_framework import serializers
 from apps.purchase.expense.models import Expense
 from apps.tax.models import Tax
 from apps.accounting.models import Account
-from apps.accounting.serializers import AccountShallowSerializer
+from apps.accounting.serializers import (
+    AccountShallowSerializer,
+    ChartOfAccountsField,
+)
 from apps.tax.serializers import TaxSerializer
 from apps.purchase.vendor.models import Vendor
 from apps.purchase.vendor.serializers import VendorShallowSerializer
@@ -19,11 +22,15 @@ class ExpenseSerializer(serializers.ModelSerializer):
         allow_null=True,
         required=False,
     )
-    account = PrimaryKey_To_ObjectField(
-        queryset=Account.actives, object_serializer=AccountShallowSerializer
+    account = ChartOfAccountsField(
+        queryset=Account.actives,
+        object_serializer=AccountShallowSerializer,
+        active_only=True,
     )
-    paid_through = PrimaryKey_To_ObjectField(
-        queryset=Account.actives, object_serializer=AccountShallowSerializer
+    paid_through = ChartOfAccountsField(
+        queryset=Account.actives,
+        object_serializer=AccountShallowSerializer,
+        active_only=True,
     )
     taxes = PrimaryKey_To_ObjectField(
         queryset=Tax.objects,
@@ -1,12 +1,34 @@
 from rest_framework.viewsets import ModelViewSet
 from apps.purchase.expense.models import Expense
 from apps.purchase.expense.serializers import ExpenseSerializer
-from apps.accounting.models import Transaction
+from apps.purchase.vendor.models import Vendor
+from apps.accounting.models import Account, Transaction
+from apps.tax.models import Tax
+from core.conditional import ConditionalGetMixin
+from core.streaming import ExportMixin
 
 
-class ExpenseViewSet(ModelViewSet):
+class ExpenseViewSet(ConditionalGetMixin, ExportMixin, ModelViewSet):
     queryset = Expense.objects
     serializer_class = ExpenseSerializer
+    conditional_models = (Vendor, Account, Tax)
+    export_fields = {
+        "id": "id",
+        "date": "date",
+        "vendor": "vendor__display_name",
+        "account": "account__code",
+        "paid_through": "paid_through__code",
+        "amount": "amount",
+        "tax_inclusive": "tax_inclusive",
+        "notes": "notes",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+
+    def get_serializer_class(self):
+        if self.action == "export":
+            return None
+        return self.serializer_class
 
     def perform_create(self, serializer):
         Transaction.objects.record_expense(serializer.save())
@@ -7,3 +7,8 @@ class ClientConfig(AppConfig):
     label = "client"
     name = "apps.sales.client"
     verbose_name = _("Client")
+
+    def ready(self):
+        from core.cache import connect_cache_invalidation
+
+        connect_cache_invalidation(self.get_model("Client"))
@@ -7,3 +7,6 @@ class InvoiceConfig(AppConfig):
     label = "invoice"
     name = "apps.sales.invoice"
     verbose_name = _("Invoice")
+
+    def ready(self):
+        from apps.sales.invoice import signals  # noqa: F401
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import schema_context
+from apps.sales.invoice.models import Invoice
+
+
+class Command(BaseCommand):
+    help = "Recalculate the stored invoice totals from their lines & payments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "schema_name", help="The tenant schema to refresh invoice totals in."
+        )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report invoices whose stored totals are out of sync.",
+        )
+
+    def handle(self, *args, **options):
+        with schema_context(options["schema_name"]):
+            if options["verify"]:
+                self.verify()
+            else:
+                count = Invoice.objects.refresh_totals()
+                self.stdout.write(f"Refreshed totals for {count} invoices.")
+
+    def verify(self):
+        out_of_sync = Invoice.objects.out_of_sync().values_list("number", flat=True)
+        for number in out_of_sync:
+            self.stdout.write(f"Invoice {number} totals are out of sync.")
+        if out_of_sync:
+            raise CommandError(f"{len(out_of_sync)} invoice totals are out of sync.")
+        self.stdout.write("All invoice totals are in sync.")
@@ -1,24 +1,136 @@
+from decimal import Decimal
+from django.apps import apps
 from django.db import models
+from django.db.models import Case, Count, F, OuterRef, Q, Sum, Value, When
+from django.db.models.functions import Now, Round
+from django.db.models.lookups import Exact, GreaterThan
+from django.utils import timezone
+from core.utils import sum_subquery
 
 
-class InvoiceManager(models.Manager):
+class InvoiceQuerySet(models.QuerySet):
+    def _totals(self):
+        InvoiceLine = apps.get_model("invoice.InvoiceLine")
+        PaymentReceived = apps.get_model("invoice.PaymentReceived")
+        total_excl_tax = sum_subquery(
+            InvoiceLine.objects.filter(invoice=OuterRef("pk")),
+            "invoice",
+            F("rate") * F("quantity"),
+        )
+        taxes_total = sum_subquery(
+            InvoiceLine.taxes.through.objects.filter(
+                invoiceline__invoice=OuterRef("pk")
+            ),
+            "invoiceline__invoice",
+            F("tax__rate")
+            / Value(Decimal(100))
+            * F("invoiceline__rate")
+            * F("invoiceline__quantity"),
+        )
+        amount_paid = sum_subquery(
+            PaymentReceived.objects.filter(invoice=OuterRef("pk")),
+            "invoice",
+            F("amount"),
+        )
+        return {
+            "taxes_total": taxes_total,
+            "total_incl_tax": total_excl_tax + taxes_total,
+            "amount_paid": amount_paid,
+            "amount_due": total_excl_tax + taxes_total - amount_paid,
+        }
+
+    def with_totals(self):
+        """
+        Annotate the line, tax & payment totals and the amount due
+        of each invoice as `computed_<total>`, calculated in the db with
+        correlated subqueries.
+        """
+        return self.annotate(
+            **{f"computed_{name}": total for name, total in self._totals().items()}
+        )
+
+    def _status(self, amount_due, amount_paid):
+        """
+        The status of invoices as a db expression.
+        """
+        from apps.sales.invoice.models import InvoiceStatus
+
+        return Case(
+            When(Exact(amount_due, 0), then=Value(InvoiceStatus.PAID)),
+            When(
+                Q(is_draft=False, due_date__lt=timezone.localdate()),
+                then=Value(InvoiceStatus.OVERDUE),
+            ),
+            When(GreaterThan(amount_paid, 0), then=Value(InvoiceStatus.PARTLY_PAID)),
+            When(is_draft=True, then=Value(InvoiceStatus.DRAFT)),
+            default=Value(InvoiceStatus.SENT),
+        )
+
+    def refresh_totals(self):
+        """
+        Recalculate & store the totals & status of every invoice
+        in the queryset with a single UPDATE.
+        """
+        totals = self._totals()
+        return self.update(
+            **totals,
+            # rounded as the stored columns are, so the status matches
+            # the one `refresh_status` derives from them
+            status=self._status(
+                Round(totals["amount_due"], 2), Round(totals["amount_paid"], 2)
+            ),
+            updated_at=Now(),
+        )
+
+    def refresh_status(self):
+        """
+        Recalculate & store the status of every invoice in the queryset
+        from its stored totals, with a single UPDATE.
+        """
+        return self.update(status=self._status(F("amount_due"), F("amount_paid")))
+
+    def mark_overdue(self):
+        """
+        Flag unpaid invoices past their due date as overdue, with a single UPDATE.
+        """
+        from apps.sales.invoice.models import InvoiceStatus
+
+        return (
+            self.filter(is_draft=False, due_date__lt=timezone.localdate())
+            .exclude(amount_due=0)
+            .exclude(status=InvoiceStatus.OVERDUE)
+            .update(status=InvoiceStatus.OVERDUE, updated_at=Now())
+        )
+
+    def out_of_sync(self):
+        """
+        Filter invoices whose stored totals differ from their lines & payments.
+        """
+        differs = Q()
+        for name in self.model.TOTAL_FIELDS:
+            differs |= ~Q(**{name: Round(f"computed_{name}", 2)})
+        return self.with_totals().filter(differs)
+
+    def with_lines_count(self):
+        return self.annotate(lines_count=Count("lines"))
+
+
+class InvoiceManager(models.Manager.from_queryset(InvoiceQuerySet)):
     def get_outstanding(self):
         """
-        Calculate amount due for all unarchived invoices.
+        Calculate amount due for all unarchived invoices,
+        in one aggregate query.
         """
-        draft, overdue, total = 0, 0, 0
-        for invoice in (
+        is_overdue = Q(is_draft=False, due_date__lt=timezone.localdate())
+        return (
             self.get_queryset()
             .filter(archived=False)
-            .prefetch_related("lines", "payments")
-        ):
-            if invoice.is_draft:
-                draft += invoice.amount_due
-                continue
-            if invoice.is_overdue:
-                overdue += invoice.amount_due
-            total += invoice.amount_due
-        return {"draft": draft, "overdue": overdue, "total": total}
+            .aggregate(
+                draft=Sum("amount_due", filter=Q(is_draft=True), default=0),
+                overdue=Sum("amount_due", filter=is_overdue, default=0),
+                total=Sum("amount_due", filter=Q(is_draft=False), default=0),
+            )
+        )
 
 
 class PaymentReceivedManager(models.Manager):
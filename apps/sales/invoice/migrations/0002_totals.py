@@ -0,0 +1,76 @@
+# Generated by Django 4.2.18 on 2026-10-18 06:01
+
+from decimal import Decimal
+from django.db import migrations, models
+from core.utils import sum_subquery
+
+
+def backfill_totals(apps, schema_editor):
+    Invoice = apps.get_model("invoice", "Invoice")
+    InvoiceLine = apps.get_model("invoice", "InvoiceLine")
+    PaymentReceived = apps.get_model("invoice", "PaymentReceived")
+    total_excl_tax = sum_subquery(
+        InvoiceLine.objects.filter(invoice=models.OuterRef("pk")),
+        "invoice",
+        models.F("rate") * models.F("quantity"),
+    )
+    taxes_total = sum_subquery(
+        InvoiceLine.taxes.through.objects.filter(
+            invoiceline__invoice=models.OuterRef("pk")
+        ),
+        "invoiceline__invoice",
+        models.F("tax__rate")
+        / models.Value(Decimal(100))
+        * models.F("invoiceline__rate")
+        * models.F("invoiceline__quantity"),
+    )
+    amount_paid = sum_subquery(
+        PaymentReceived.objects.filter(invoice=models.OuterRef("pk")),
+        "invoice",
+        models.F("amount"),
+    )
+    Invoice.objects.update(
+        taxes_total=taxes_total,
+        total_incl_tax=total_excl_tax + taxes_total,
+        amount_paid=amount_paid,
+        amount_due=total_excl_tax + taxes_total - amount_paid,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("invoice", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invoice",
+            name="amount_due",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=26
+            ),
+        ),
+        migrations.AddField(
+            model_name="invoice",
+            name="amount_paid",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=26
+            ),
+        ),
+        migrations.AddField(
+            model_name="invoice",
+            name="taxes_total",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=26
+            ),
+        ),
+        migrations.AddField(
+            model_name="invoice",
+            name="total_incl_tax",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=26
+            ),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
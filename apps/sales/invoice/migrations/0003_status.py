@@ -0,0 +1,47 @@
+# Generated by Django 4.2.18 on 2026-10-18 06:14
+
+from django.utils import timezone
+from django.db import migrations, models
+
+
+def backfill_status(apps, schema_editor):
+    Invoice = apps.get_model("invoice", "Invoice")
+    Invoice.objects.update(
+        status=models.Case(
+            models.When(amount_due=0, then=models.Value("paid")),
+            models.When(
+                is_draft=False, due_date__lt=timezone.localdate(), then=models.Value("overdue")
+            ),
+            models.When(amount_paid__gt=0, then=models.Value("partly paid")),
+            models.When(is_draft=True, then=models.Value("draft")),
+            default=models.Value("sent"),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("invoice", "0002_totals"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invoice",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("draft", "Draft - Generated but not sent to the client."),
+                    ("sent", "Sent"),
+                    ("partly paid", "Partly Paid"),
+                    ("paid", "Paid"),
+                    ("overdue", "Overdue - Full payment not made as of due date."),
+                ],
+                db_index=True,
+                default="draft",
+                editable=False,
+                max_length=16,
+            ),
+        ),
+        migrations.RunPython(backfill_status, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,13 @@
+from django.db import migrations
+from core.utils import create_number_sequence
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("invoice", "0003_status"),
+    ]
+
+    operations = [
+        create_number_sequence("INV", "invoice_invoice"),
+    ]
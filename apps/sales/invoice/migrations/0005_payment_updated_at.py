@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-18 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("invoice", "0004_number_sequence"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paymentreceived",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -1,13 +1,14 @@
 from datetime import date
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from django.apps import apps
 from .managers import InvoiceManager, PaymentReceivedManager
-from core.utils import get_next_number
+from core.utils import get_next_number, memoized_property
 
 
 def get_invoice_next_number():
-    return get_next_number(Invoice, Invoice.NUMBER_PREFIX)
+    return get_next_number(Invoice.NUMBER_PREFIX)
 
 
 class InvoiceStatus(models.TextChoices):
@@ -59,6 +60,33 @@ class Invoice(models.Model):
     notes = models.TextField(blank=True)
     terms = models.TextField(blank=True)
 
+    # totals are stored so they can be filtered & sorted on, and are
+    # recalculated as lines, line taxes & payments change.
+    # see `InvoiceQuerySet.refresh_totals`
+    TOTAL_FIELDS = ["total_incl_tax", "taxes_total", "amount_paid", "amount_due"]
+    total_incl_tax = models.DecimalField(
+        max_digits=26, decimal_places=2, default=0, editable=False
+    )
+    taxes_total = models.DecimalField(
+        max_digits=26, decimal_places=2, default=0, editable=False
+    )
+    amount_paid = models.DecimalField(
+        max_digits=26, decimal_places=2, default=0, editable=False
+    )
+    amount_due = models.DecimalField(
+        max_digits=26, decimal_places=2, default=0, editable=False
+    )
+
+    # kept in sync with the totals & `is_draft`, and flipped to
+    # overdue by the `mark_overdue_invoices` task once `due_date` passes
+    status = models.CharField(
+        max_length=16,
+        choices=InvoiceStatus.choices,
+        default=InvoiceStatus.DRAFT,
+        db_index=True,
+        editable=False,
+    )
+
     archived = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True, db_index=True)
@@ -71,12 +99,39 @@ class Invoice(models.Model):
     def __str__(self) -> str:
         return self.client.display_name + "/" + self.number
 
-    def __ini__(self, *args, **kwargs):
+    def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        # we keep a cached copy of invoice lines as we
-        # refer to them often within a request cycle
-        self._lines = None
+        # we keep a cached copy of invoice lines & values derived from
+        # them as we refer to them often within a request cycle.
+        # see `invalidate_cache`
+        self._cache = {}
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            # the first `refresh_totals` sets the status from the totals
+            self.status = InvoiceStatus.DRAFT if self.is_draft else InvoiceStatus.SENT
+            super().save(*args, **kwargs)
+            self.invalidate_cache()
+            return
+
+        if kwargs.get("update_fields") is None:
+            # totals & status are only written by `refresh_totals` &
+            # `refresh_status`, so a stale instance never overwrites them
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in [*self.TOTAL_FIELDS, "status"]
+            ]
+        super().save(*args, **kwargs)
+        # status follows `is_draft` & `due_date` edits, from the stored totals
+        Invoice.objects.filter(pk=self.pk).refresh_status()
+        self.refresh_from_db(fields=["status"])
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.invalidate_cache()
 
     @property
     def is_sent(self):
@@ -84,53 +139,18 @@ class Invoice(models.Model):
 
     @property
     def is_overdue(self):
-        return self.due_date and date.today() > self.due_date and not self.is_draft
-
-    @property
-    def total_incl_tax(self):
-        total = 0
-        for line in self.all_lines():
-            total += line.total_incl_tax
-        return total
+        return self.due_date and timezone.localdate() > self.due_date and not self.is_draft
 
     @property
     def total_excl_tax(self):
-        total = 0
-        for line in self.all_lines():
-            total += line.total_excl_tax
-        return total
+        return self.total_incl_tax - self.taxes_total
 
-    @property
+    @memoized_property
     def total_items(self):
-        return self.all_lines().count()
-
-    @property
-    def taxes_total(self):
-        total = 0
-        for line in self.all_lines():
-            total += line.taxes_total
-        return total
-
-    @property
-    def amount_paid(self):
-        return sum([payment.amount for payment in self.payments.all()])
-
-    @property
-    def amount_due(self):
-        return self.total_incl_tax - self.amount_paid
-
-    @property
-    def status(self):
-        if self.amount_due == 0:
-            return InvoiceStatus.PAID
-        elif self.is_overdue:
-            return InvoiceStatus.OVERDUE
-        elif self.amount_paid > 0:
-            return InvoiceStatus.PARTLY_PAID
-        elif self.is_draft:
-            return InvoiceStatus.DRAFT
-        else:
-            return InvoiceStatus.SENT
+        # annotated on list querysets, see `with_lines_count`
+        if hasattr(self, "lines_count"):
+            return self.lines_count
+        return len(self.all_lines())
 
     def move_to_draft(self):
         if self.status != InvoiceStatus.SENT:
@@ -150,12 +170,32 @@ class Invoice(models.Model):
 
     mark_as_sent.alters_data = True
 
+    def refresh_totals(self):
+        Invoice.objects.filter(pk=self.pk).refresh_totals()
+        self.refresh_from_db(fields=[*self.TOTAL_FIELDS, "status", "updated_at"])
+
+    refresh_totals.alters_data = True
+
+    def invalidate_cache(self):
+        """
+        Drop the cached lines & derived values, call this
+        when lines or payments change outside this instance.
+        """
+        self._cache.clear()
+        getattr(self, "_prefetched_objects_cache", {}).pop("lines", None)
+
     def all_lines(self):
-        if getattr(self, "_lines", None) is None:
-            self._lines = self.lines.prefetch_related("taxes")
-        return self._lines
+        if "lines" not in self._cache:
+            if "lines" in getattr(self, "_prefetched_objects_cache", {}):
+                # lines (& their taxes) were prefetched with the queryset
+                self._cache["lines"] = list(self.lines.all())
+            else:
+                self._cache["lines"] = list(self.lines.prefetch_related("taxes"))
+        return self._cache["lines"]
 
     def generate_each_tax_total(self):
+        if "each_tax_total" in self._cache:
+            return self._cache["each_tax_total"]
         total = {}
         for line in self.all_lines():
             for tax in line.taxes.all():
@@ -163,6 +203,7 @@ class Invoice(models.Model):
                     total[tax.name] += (tax.rate / 100) * line.total_excl_tax
                 else:
                     total[tax.name] = (tax.rate / 100) * line.total_excl_tax
+        self._cache["each_tax_total"] = total
         return total
 
 
@@ -212,6 +253,7 @@ class PaymentReceived(models.Model):
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     mode = models.CharField(max_length=32)
     description = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = PaymentReceivedManager()
 
@@ -75,6 +75,7 @@ class InvoiceSerializer(BaseInvoiceSerializer):
         with transaction.atomic():
             instance = super().update(instance, validated_data)
             self.update_relation("lines", instance.lines, lines_data)
+            instance.refresh_totals()
             return instance
 
 
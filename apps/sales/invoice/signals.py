@@ -0,0 +1,61 @@
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.sales.invoice.models import Invoice, InvoiceLine, PaymentReceived
+from apps.tax.models import Tax
+
+
+def _deletes_invoice(origin):
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is Invoice
+
+
+@receiver(post_save, sender=InvoiceLine)
+@receiver(post_delete, sender=InvoiceLine)
+@receiver(post_save, sender=PaymentReceived)
+@receiver(post_delete, sender=PaymentReceived)
+def refresh_invoice_totals(sender, instance, origin=None, **kwargs):
+    if _deletes_invoice(origin):
+        # deleted along with their invoice, there are no totals left to refresh
+        return
+    if sender.invoice.is_cached(instance) and instance.invoice is not None:
+        # keep the invoice in memory (& its cached values) in sync too
+        instance.invoice.refresh_totals()
+    else:
+        Invoice.objects.filter(pk=instance.invoice_id).refresh_totals()
+
+
+@receiver(pre_save, sender=PaymentReceived)
+def refresh_previous_invoice_totals(sender, instance, **kwargs):
+    # a payment moved to another invoice changes the totals of both
+    if instance.pk is None:
+        return
+    previous = PaymentReceived.objects.filter(pk=instance.pk).values_list(
+        "invoice_id", flat=True
+    )
+    Invoice.objects.filter(pk__in=previous).exclude(
+        pk=instance.invoice_id
+    ).refresh_totals()
+
+
+@receiver(m2m_changed, sender=InvoiceLine.taxes.through)
+def refresh_invoice_totals_on_line_taxes(sender, instance, action, pk_set, **kwargs):
+    if isinstance(instance, InvoiceLine):
+        if action in ["post_add", "post_remove", "post_clear"]:
+            Invoice.objects.filter(pk=instance.invoice_id).refresh_totals()
+    elif action == "pre_clear":
+        # `pk_set` is None on clear, so note the invoices of the lines first
+        instance._cleared_invoice_ids = list(
+            Invoice.objects.filter(lines__taxes=instance).values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        invoice_ids = instance.__dict__.pop("_cleared_invoice_ids", [])
+        Invoice.objects.filter(pk__in=invoice_ids).refresh_totals()
+    elif action in ["post_add", "post_remove"]:
+        Invoice.objects.filter(lines__in=pk_set).refresh_totals()
+
+
+@receiver(post_save, sender=Tax)
+def refresh_invoice_totals_on_tax_rate(sender, instance, created, **kwargs):
+    if not created:
+        Invoice.objects.filter(lines__taxes=instance).refresh_totals()
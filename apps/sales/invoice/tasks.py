@@ -0,0 +1,22 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django_tenants.utils import (
+    get_public_schema_name,
+    get_tenant_model,
+    schema_context,
+)
+from apps.sales.invoice.models import Invoice
+
+logging = get_task_logger(__name__)
+
+
+@shared_task
+def mark_overdue_invoices():
+    """
+    Flag the invoices that went past their due date as overdue, for every tenant.
+    """
+    tenants = get_tenant_model().objects.exclude(schema_name=get_public_schema_name())
+    for schema_name in tenants.values_list("schema_name", flat=True):
+        with schema_context(schema_name):
+            count = Invoice.objects.mark_overdue()
+        logging.info("%s invoices marked as overdue for %s", count, schema_name)
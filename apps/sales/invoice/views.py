@@ -1,18 +1,74 @@
+from django.db.models import Count
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.response import Response
 from rest_framework import status
 from apps.accounting.models import Transaction
+from apps.address.models import Address
+from apps.inventory.item.models import Item
+from apps.sales.client.models import Client
 from apps.sales.invoice.models import Invoice, InvoiceStatus, PaymentReceived
 from apps.sales.invoice.serializers import InvoiceSerializer, PaymentReceivedSerializer
+from apps.tax.models import Tax
+from apps.user.models import User
+from core.conditional import ConditionalGetMixin
+from core.streaming import ExportMixin
 
 
-class InvoiceViewSet(ModelViewSet):
+class InvoiceViewSet(ConditionalGetMixin, ExportMixin, ModelViewSet):
     queryset = Invoice.objects.all()
     serializer_class = InvoiceSerializer
+    conditional_models = (Client, Address, Item, Tax, User)
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ["status"]
+    ordering_fields = [
+        "number",
+        "issued_date",
+        "due_date",
+        "total_incl_tax",
+        "amount_paid",
+        "amount_due",
+        "created_at",
+    ]
+    export_fields = {
+        "id": "id",
+        "number": "number",
+        "client": "client__display_name",
+        "issued_date": "issued_date",
+        "due_date": "due_date",
+        "salesperson": "salesperson__email",
+        "is_draft": "is_draft",
+        "discount_as_percent": "discount_as_percent",
+        "discount_value": "discount_value",
+        "total_incl_tax": "total_incl_tax",
+        "taxes_total": "taxes_total",
+        "amount_paid": "amount_paid",
+        "amount_due": "amount_due",
+        "archived": "archived",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ["list", "retrieve"]:
+            queryset = (
+                queryset.select_related("client__shipping_address", "salesperson")
+                .prefetch_related("lines__item", "lines__taxes")
+                .with_lines_count()
+            )
+        return queryset
 
     def get_serializer_class(self):
-        if self.action in ["move_to_draft", "mark_as_sent", "outstanding"]:
+        if self.action in [
+            "move_to_draft",
+            "mark_as_sent",
+            "outstanding",
+            "counts",
+            "export",
+        ]:
             return None
         return self.serializer_class
 
@@ -23,7 +79,7 @@ class InvoiceViewSet(ModelViewSet):
         self.record_transaction(serializer.save())
 
     def perform_destroy(self, instance):
-        if instance.status is not InvoiceStatus.DRAFT:
+        if instance.status != InvoiceStatus.DRAFT:
             return Response(
                 "Sent Invoice cannot be deleted", status=status.HTTP_400_BAD_REQUEST
             )
@@ -43,8 +99,22 @@ class InvoiceViewSet(ModelViewSet):
     def outstanding(self, request):
         return Response(Invoice.objects.get_outstanding())
 
+    @action(["get"], detail=False)
+    def counts(self, request):
+        """
+        Number of unarchived invoices in each status.
+        """
+        counts = dict.fromkeys(InvoiceStatus.values, 0)
+        counts.update(
+            Invoice.objects.filter(archived=False)
+            .order_by()
+            .values_list("status")
+            .annotate(Count("id"))
+        )
+        return Response(counts)
+
     def record_transaction(self, instance):
-        if instance.status is not InvoiceStatus.DRAFT:
+        if instance.status != InvoiceStatus.DRAFT:
             Transaction.objects.record_invoice(instance)
 
 
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class SyncConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    label = "sync"
+    name = "apps.sync"
+    verbose_name = _("Sync")
+
+    def ready(self):
+        from apps.sync import signals  # noqa: F401
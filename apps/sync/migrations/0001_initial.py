@@ -0,0 +1,38 @@
+# Generated by Django 4.2.18 on 2026-10-18 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model", models.CharField(max_length=64)),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["model", "deleted_at"],
+                        name="sync_tombst_model_a435c9_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """
+    A trace of a hard deleted row of a synced model, kept for
+    `settings.SYNC_TOMBSTONE_RETENTION` so that clients can
+    drop their copy of it (see `apps.sync.registry`).
+    """
+
+    model = models.CharField(max_length=64)
+    object_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["model", "deleted_at"])]
+
+    def __str__(self) -> str:
+        return f"{self.model}:{self.object_id}"
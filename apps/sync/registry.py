@@ -0,0 +1,22 @@
+"""
+Resources served by the sync endpoint, by name: the label of the
+model & the viewset whose list queryset & serializer are reused.
+
+Synced models must keep an `updated_at` field up to date, including
+on queryset updates, since it is what created & updated rows are
+selected on.
+"""
+
+SYNCED_RESOURCES = {
+    "invoices": ("invoice.Invoice", "apps.sales.invoice.views.InvoiceViewSet"),
+    "payments_received": (
+        "invoice.PaymentReceived",
+        "apps.sales.invoice.views.PaymentReceivedViewSet",
+    ),
+    "bills": ("bill.Bill", "apps.purchase.bill.views.BillViewSet"),
+    "payments_made": (
+        "bill.PaymentMade",
+        "apps.purchase.bill.views.PaymentMadeViewSet",
+    ),
+    "expenses": ("expense.Expense", "apps.purchase.expense.views.ExpenseViewSet"),
+}
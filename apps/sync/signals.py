@@ -0,0 +1,14 @@
+from django.apps import apps
+from django.db.models.signals import post_delete
+from apps.sync.models import Tombstone
+from apps.sync.registry import SYNCED_RESOURCES
+
+
+def record_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(model=sender._meta.label, object_id=instance.pk)
+
+
+for label, _viewset in SYNCED_RESOURCES.values():
+    post_delete.connect(
+        record_tombstone, sender=apps.get_model(label), dispatch_uid=f"sync:{label}"
+    )
@@ -0,0 +1,26 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.utils import timezone
+from django_tenants.utils import (
+    get_public_schema_name,
+    get_tenant_model,
+    schema_context,
+)
+from apps.sync.models import Tombstone
+
+logging = get_task_logger(__name__)
+
+
+@shared_task
+def prune_tombstones():
+    """
+    Delete the tombstones older than the sync retention, for every tenant.
+    Clients with an older sync token get a full sync instead.
+    """
+    expired = timezone.now() - settings.SYNC_TOMBSTONE_RETENTION
+    tenants = get_tenant_model().objects.exclude(schema_name=get_public_schema_name())
+    for schema_name in tenants.values_list("schema_name", flat=True):
+        with schema_context(schema_name):
+            count, _ = Tombstone.objects.filter(deleted_at__lt=expired).delete()
+        logging.info("%s tombstones pruned for %s", count, schema_name)
@@ -0,0 +1,82 @@
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from apps.sync.models import Tombstone
+from apps.sync.registry import SYNCED_RESOURCES
+from core.permissions import BelongsToOrganisation
+
+
+class SyncView(APIView):
+    """
+    Return the rows of the synced resources (see `apps.sync.registry`)
+    created, updated or deleted since the `since` token of a previous sync.
+
+    Without a token, or with one older than the tombstone retention,
+    every row is returned & `full` is true: the client should then
+    replace its copy. Resources the user cannot view are left out.
+
+    e.g:
+    {
+        "token": "2024-05-01T10:00:00.000000+00:00",
+        "full": false,
+        "resources": {
+            "invoices": {"updated": [...], "deleted": [12, 13]},
+            ...
+        }
+    }
+    """
+
+    permission_classes = [BelongsToOrganisation]
+
+    def get_since(self, request):
+        since = request.query_params.get("since")
+        if not since:
+            return None
+        since = parse_datetime(since)
+        if since is None or timezone.is_naive(since):
+            raise ValidationError({"since": "Invalid sync token."})
+        return since
+
+    def get(self, request, *args, **kwargs):
+        now = timezone.now()
+        since = self.get_since(request)
+        full = since is None or since < now - settings.SYNC_TOMBSTONE_RETENTION
+
+        resources = {}
+        for name, (label, viewset_path) in SYNCED_RESOURCES.items():
+            model = apps.get_model(label)
+            opts = model._meta
+            if not request.user.has_perm(f"{opts.app_label}.view_{opts.model_name}"):
+                continue
+
+            # reuse the list queryset (& its prefetching) and serializer
+            viewset = import_string(viewset_path)(
+                request=request,
+                action="list",
+                format_kwarg=self.format_kwarg,
+                args=(),
+                kwargs={},
+            )
+            queryset = viewset.get_queryset()
+            deleted = []
+            if not full:
+                queryset = queryset.filter(updated_at__gte=since)
+                deleted = Tombstone.objects.filter(
+                    model=label, deleted_at__gte=since
+                ).values_list("object_id", flat=True)
+            resources[name] = {
+                "updated": viewset.get_serializer(queryset, many=True).data,
+                "deleted": list(deleted),
+            }
+
+        # rows written by transactions still running now are
+        # picked up by the next sync thanks to the overlap
+        token = now - settings.SYNC_TOKEN_OVERLAP
+        return Response(
+            {"token": token.isoformat(), "full": full, "resources": resources}
+        )
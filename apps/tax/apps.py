@@ -7,3 +7,8 @@ class TaxConfig(AppConfig):
     label = "tax"
     name = "apps.tax"
     verbose_name = _("Tax")
+
+    def ready(self):
+        from core.cache import connect_cache_invalidation
+
+        connect_cache_invalidation(self.get_model("Tax"))
@@ -2,13 +2,15 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
 from rest_framework import status
 from rest_framework.response import Response
+from core.cache import CachedResponseMixin
 from .models import Tax
 from .serializers import TaxSerializer
 
 
-class TaxViewSet(ModelViewSet):
+class TaxViewSet(CachedResponseMixin, ModelViewSet):
     queryset = Tax.objects.all()
     serializer_class = TaxSerializer
+    cache_models = (Tax,)
 
     @action(["post"], detail=False)
     def bulk_create_or_update(self, request):
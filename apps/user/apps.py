@@ -7,3 +7,13 @@ class UserConfig(AppConfig):
     label = "user"
     name = "apps.user"
     verbose_name = _("User")
+
+    def ready(self):
+        from django.contrib.auth.models import Permission
+        from tenant_users.permissions.models import UserTenantPermissions
+        from apps.user.models import User
+        from core.cache import connect_cache_invalidation
+
+        connect_cache_invalidation(Permission, UserTenantPermissions)
+        # logging in saves `last_login` only
+        connect_cache_invalidation(User, ignored_fields=("last_login",))
@@ -2,7 +2,10 @@ from django.db import models
 from django.conf import settings
 from django.contrib.auth.models import Permission
 from django.utils.translation import gettext_lazy as _
+from tenant_users.permissions.functional import tenant_cached_property
+from tenant_users.permissions.models import UserTenantPermissions
 from tenant_users.tenants.models import UserProfile
+from core.permissions import get_tenant_permissions
 
 
 class User(UserProfile):
@@ -49,6 +52,25 @@ class User(UserProfile):
 
         return super().save(*args, **kwargs)
 
+    @tenant_cached_property
+    def tenant_perms(self):
+        """
+        The permissions of the user in the current tenant, built from
+        the cached authorization of the user instead of the db.
+        """
+        state = get_tenant_permissions(self.pk)
+        if state is None:
+            raise UserTenantPermissions.DoesNotExist
+        tenant_perms = UserTenantPermissions(
+            id=state["id"],
+            profile=self,
+            is_superuser=state["is_superuser"],
+            is_staff=state["is_staff"],
+        )
+        tenant_perms._state.adding = False
+        tenant_perms._perm_cache = set(state["perms"])
+        return tenant_perms
+
     @property
     def is_employee(self) -> bool:
         return self.role == self.EMPLOYEE
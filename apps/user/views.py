@@ -6,8 +6,10 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, DjangoModelPermissions
 from django_tenants.utils import schema_context
+from tenant_users.permissions.models import UserTenantPermissions
 from apps.department.models import Department
-from core.permissions import BelongsToOrganisation
+from core.cache import CachedResponseMixin, cache_response
+from core.permissions import BelongsToOrganisation, get_tenant_permissions
 from .models import User
 from .serializers import (
     UserSerializer,
@@ -180,11 +182,12 @@ class PermissionSourceOfTruthPermissions(DjangoModelPermissions):
     perms_map = {"GET": ["user.change_user", "department.change_department"]}
 
 
-class PermissionViewSet(ModelViewSet):
+class PermissionViewSet(CachedResponseMixin, ModelViewSet):
     queryset = Permission.objects.exclude(
         content_type__app_label__in=["admin", "auth", "contenttypes"]
     ).select_related("content_type")
     serializer_class = PermissionSerializer
+    cache_models = (Permission, UserTenantPermissions, Department)
 
     def get_permissions(self):
         if self.action == "source_of_truth":
@@ -195,6 +198,7 @@ class PermissionViewSet(ModelViewSet):
         return super().get_permissions()
 
     @action(["get"], detail=False)
+    @cache_response
     def source_of_truth(self, request, *args, **kwargs):
         """
         Return all available permissions but, categorised by predefined
@@ -225,23 +229,31 @@ class PermissionViewSet(ModelViewSet):
             ]
         }
         """
-        perms_categories = settings.PERMISSION_CATEGORIES
+        active, inherited = self._get_assigned_perms(request)
+        categories_by_model = {}
+        for category, models in settings.PERMISSION_CATEGORIES.items():
+            for model in models:
+                categories_by_model.setdefault(model, []).append(category)
+
         perms_by_categories = {}
         for perm in self.queryset:
             perm_model = perm.content_type.name
-            for category, models in perms_categories.items():
-                if perm_model not in models:
-                    continue
-                if category not in perms_by_categories:
-                    perms_by_categories[category] = {}
-                perm_data = self._get_perm_data(request, perm)
-                if perm_model in perms_by_categories[category]:
-                    perms_by_categories[category][perm_model].append(perm_data)
-                else:
-                    perms_by_categories[category][perm_model] = [perm_data]
+            perm_data = {
+                "perm": {"id": perm.id, "name": perm.name, "codename": perm.codename},
+                "active": active is True or perm.id in active,
+                "inherited": perm.id in inherited,
+            }
+            for category in categories_by_model.get(perm_model, []):
+                category_perms = perms_by_categories.setdefault(category, {})
+                category_perms.setdefault(perm_model, []).append(perm_data)
         return Response(perms_by_categories)
 
-    def _get_perm_data(self, request, perm):
+    def _get_assigned_perms(self, request):
+        """
+        Return the ids of the permissions assigned to the user or department
+        of the request query params (`True` for all of them), and the ids of
+        those inherited from departments.
+        """
         user_id = request.query_params.get("user", 0)
         dept_id = request.query_params.get("department", 0)
         user_object = None
@@ -249,24 +261,27 @@ class PermissionViewSet(ModelViewSet):
 
         with contextlib.suppress(User.DoesNotExist):
             user_object = User.objects.get(id=int(user_id))
-        with contextlib.suppress(Department.DoesNotExist):
-            dept_object = Department.objects.get(id=int(dept_id))
-
-        perm_dict = {"id": perm.id, "name": perm.name, "codename": perm.codename}
-
         if user_object:
-            perm_string = f"{perm.content_type.app_label}.{perm.codename}"
-            return {
-                "perm": perm_dict,
-                "active": user_object.has_perm(perm_string),
-                "inherited": perm_string in user_object.get_group_permissions(),
-            }
+            if not user_object.is_active:
+                return set(), set()
+            inherited = set(
+                Permission.objects.filter(group__user__profile=user_object).values_list(
+                    "id", flat=True
+                )
+            )
+            tenant_perms = get_tenant_permissions(user_object.id)
+            if tenant_perms and tenant_perms["is_superuser"]:
+                return True, inherited
+            active = set(
+                Permission.objects.filter(user__profile=user_object).values_list(
+                    "id", flat=True
+                )
+            )
+            return active | inherited, inherited
 
+        with contextlib.suppress(Department.DoesNotExist):
+            dept_object = Department.objects.get(id=int(dept_id))
         if dept_object:
-            return {
-                "perm": perm_dict,
-                "active": dept_object.permissions.filter(id=perm.id).exists(),
-                "inherited": False,
-            }
+            return set(dept_object.permissions.values_list("id", flat=True)), set()
 
-        return {"perm": perm_dict, "active": False, "inherited": False}
+        return set(), set()
@@ -0,0 +1,18 @@
+from tenant_users.permissions.backend import UserBackend
+from core.permissions import get_tenant_permissions
+
+
+class CachedUserBackend(UserBackend):
+    """
+    UserBackend that reads the permissions of a user from the cached
+    authorization of the user in the current tenant, instead of
+    querying the user & department permissions on every request.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            state = get_tenant_permissions(user_obj.profile_id)
+            user_obj._perm_cache = set(state["perms"]) if state else set()
+        return user_obj._perm_cache
@@ -0,0 +1,155 @@
+"""
+Tenant-aware cache of API responses for read-mostly endpoints.
+
+A cached response is keyed by tenant schema, view, action, url kwargs,
+query params & the cache scope of the request, plus a version number
+per model the response is built from (`cache_models`). Saving or
+deleting one of these models, or changing one of its many to many
+relations, bumps its version (see `connect_cache_invalidation`) which
+retires every response built from it. Versions are kept per tenant,
+except for the shared models (apps not in `TENANT_APPS`) whose rows
+live in the public schema: their versions are shared by every tenant.
+
+Queryset `update()` & `bulk_create()` send no signals, code using them
+on a cached model must call `invalidate_models` itself.
+"""
+
+import hashlib
+from functools import wraps
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django_tenants.utils import get_public_schema_name
+from rest_framework.response import Response
+
+
+def _version_key(schema_name, label):
+    if apps.get_model(label)._meta.app_config.name not in settings.TENANT_APPS:
+        schema_name = get_public_schema_name()
+    return f"response-cache:{schema_name}:{label}:version"
+
+
+def get_versions(labels):
+    schema_name = connection.schema_name
+    keys = [_version_key(schema_name, label) for label in labels]
+    versions = cache.get_many(keys)
+    return [versions.get(key, 0) for key in keys]
+
+
+def bump_version(label, schema_name=None):
+    key = _version_key(schema_name or connection.schema_name, label)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def invalidate_models(*models):
+    """
+    Bump the version of `models`, now & again once the transaction is
+    committed, so a response cached by another request in the meantime
+    is retired too. Call this after queryset `update()` or `bulk_create()`.
+    """
+    schema_name = connection.schema_name
+    labels = [model._meta.label for model in models]
+
+    def bump_versions():
+        for label in labels:
+            bump_version(label, schema_name)
+
+    bump_versions()
+    transaction.on_commit(bump_versions)
+
+
+def connect_cache_invalidation(*models, ignored_fields=()):
+    """
+    Bump the version of `models` whenever one of their rows is saved or
+    deleted, or one of their many to many relations is changed
+    (see `invalidate_models`). Saves limited to `ignored_fields`, fields
+    no cached response is built from, are skipped.
+    """
+    for model in models:
+        label = model._meta.label
+
+        def invalidate(sender, model=model, update_fields=None, **kwargs):
+            if update_fields and set(update_fields) <= set(ignored_fields):
+                return
+            invalidate_models(model)
+
+        uid = f"response-cache:{label}"
+        post_save.connect(invalidate, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(invalidate, sender=model, weak=False, dispatch_uid=uid)
+        for field in model._meta.many_to_many:
+            m2m_changed.connect(
+                invalidate,
+                sender=field.remote_field.through,
+                weak=False,
+                dispatch_uid=f"{uid}:{field.name}",
+            )
+
+
+def cache_response(view_method):
+    """
+    Serve the response data of a view method from the cache of its view.
+    Only successful responses are cached.
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        return response
+
+    return wrapper
+
+
+class CachedResponseMixin:
+    """
+    Cache the `list` response of a view. Other actions can be cached
+    with the `cache_response` decorator.
+
+    Set `cache_models` to the models the responses are built from.
+    Permission checks still run before the cache lookup. Responses are
+    scoped by the permissions of the user, override `get_cache_scope`
+    when the response depends on more of the user.
+    """
+
+    cache_models = ()
+    cache_timeout = settings.RESPONSE_CACHE_TIMEOUT
+
+    def get_cache_scope(self, request):
+        from core.permissions import get_tenant_permissions
+
+        if not request.user or not request.user.is_authenticated:
+            return ""
+        state = get_tenant_permissions(request.user.id)
+        if state is None:
+            return ""
+        return (state["is_superuser"], sorted(state["perms"]))
+
+    def get_response_cache_key(self, request):
+        labels = sorted(model._meta.label for model in self.cache_models)
+        versions = ".".join(str(version) for version in get_versions(labels))
+        params = (
+            sorted(self.kwargs.items()),
+            sorted(request.query_params.lists()),
+            self.get_cache_scope(request),
+        )
+        digest = hashlib.md5(repr(params).encode(), usedforsecurity=False)
+        view = f"{type(self).__module__}.{type(self).__qualname__}"
+        action = getattr(self, "action", None) or request.method.lower()
+        return (
+            f"response-cache:{connection.schema_name}:{view}:{action}"
+            f":{versions}:{digest.hexdigest()}"
+        )
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
@@ -0,0 +1,75 @@
+"""
+Conditional GET (ETag) for list & retrieve endpoints.
+"""
+
+import hashlib
+from django.db import connection
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from core.cache import get_versions
+
+
+class ConditionalGetMixin:
+    """
+    Send an ETag header with `list` & `retrieve` responses and answer
+    304 Not Modified, without running the serializers, when the copy of
+    the client is still fresh.
+
+    The ETag is computed with one query from the max `updated_at` & row
+    count of the filtered queryset, plus the cache versions (see
+    `core.cache`) of `conditional_models`, the related models nested in
+    the response whose changes do not touch `updated_at`.
+
+    No Last-Modified header is sent: the max `updated_at` alone misses
+    deleted rows & changes to `conditional_models`.
+    """
+
+    conditional_models = ()
+    updated_at_field = "updated_at"
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        return queryset
+
+    def get_etag(self, request):
+        state = (
+            self.get_conditional_queryset()
+            .order_by()
+            .aggregate(updated_at=Max(self.updated_at_field), count=Count("pk"))
+        )
+        labels = sorted(model._meta.label for model in self.conditional_models)
+        key = (
+            connection.schema_name,
+            f"{type(self).__module__}.{type(self).__qualname__}",
+            self.action,
+            sorted(self.kwargs.items()),
+            sorted(request.query_params.lists()),
+            state["updated_at"],
+            state["count"],
+            get_versions(labels),
+        )
+        return quote_etag(
+            hashlib.md5(repr(key).encode(), usedforsecurity=False).hexdigest()
+        )
+
+    def conditional_response(self, view_method, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = view_method(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response["ETag"] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,95 @@
+import sys
+from types import ModuleType
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.urls import URLResolver, set_urlconf
+from django.utils.module_loading import import_string
+from django_tenants.middleware import TenantSubfolderMiddleware
+from django_tenants.urlresolvers import TenantPrefixPattern
+from django_tenants.utils import get_subfolder_prefix
+
+_MISSING = "missing"
+
+
+def _tenant_key(subfolder):
+    return f"tenant:subfolder:{subfolder}"
+
+
+def clear_cached_tenants(*subfolders):
+    """
+    Drop the cached tenants (or unknown tenant markers) of `subfolders`,
+    call this whenever the domain of a tenant changes.
+
+    They are dropped again once the transaction is committed, in case a
+    request cached the domains as they were before the change.
+    """
+    keys = [_tenant_key(subfolder) for subfolder in subfolders]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class ResolvedTenantPrefixPattern(TenantPrefixPattern):
+    """
+    TenantPrefixPattern that builds the prefix from the subfolder the
+    tenant was resolved from, instead of querying its domain again on
+    every url match.
+    """
+
+    @property
+    def tenant_prefix(self):
+        subfolder = getattr(connection.tenant, "domain_subfolder", None)
+        if subfolder is None:
+            return super().tenant_prefix
+        return f"{get_subfolder_prefix()}/{subfolder}/"
+
+
+class TenantPrefixedURLConf(ModuleType):
+    def __init__(self, name, urlconf):
+        super().__init__(name)
+        self.urlconf = urlconf
+
+    def __getattr__(self, attr):
+        imported = import_string(f"{self.urlconf}.{attr}")
+        if attr == "urlpatterns":
+            return [URLResolver(ResolvedTenantPrefixPattern(), list(imported))]
+        return imported
+
+
+def get_subfolder_urlconf():
+    name = f"{settings.ROOT_URLCONF}_resolved_tenant_prefixed"
+    if name not in sys.modules:
+        sys.modules[name] = TenantPrefixedURLConf(name, settings.ROOT_URLCONF)
+    return name
+
+
+class CachedTenantSubfolderMiddleware(TenantSubfolderMiddleware):
+    """
+    TenantSubfolderMiddleware that reads the tenant of a subfolder from
+    Django's cache instead of the domain table.
+
+    Unknown subfolders are cached too, for a short while only, so that
+    scanning traffic does not hit the db either.
+    """
+
+    def get_tenant(self, domain_model, hostname):
+        key = _tenant_key(hostname)
+        tenant = cache.get(key)
+        if tenant == _MISSING:
+            raise domain_model.DoesNotExist
+        if tenant is not None:
+            return tenant
+
+        try:
+            tenant = super().get_tenant(domain_model, hostname)
+        except domain_model.DoesNotExist:
+            cache.set(key, _MISSING, settings.TENANT_NOT_FOUND_CACHE_TIMEOUT)
+            raise
+        cache.set(key, tenant, settings.TENANT_CACHE_TIMEOUT)
+        return tenant
+
+    def process_request(self, request):
+        super().process_request(request)
+        if getattr(request, "urlconf", None):
+            request.urlconf = get_subfolder_urlconf()
+            set_urlconf(request.urlconf)
@@ -0,0 +1,115 @@
+import json
+from base64 import b64decode, b64encode
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a unique, descending (`date`, `id`) ordering.
+
+    The cursor holds the key of the last row of the page, and the next page
+    is fetched by filtering for rows with a lower key. Unlike offsets, this
+    reads the same number of rows however deep the client pages, as long as
+    an index covers the ordering.
+
+    e.g
+    {
+        "next": "http://.../transactions/?cursor=WyIyMDI1LTAyLTAxVDEy...",
+        "results": [...]
+    }
+    """
+
+    ordering = ("date", "id")
+    page_size = 100
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*[f"-{field}" for field in self.ordering])
+
+        key = self.decode_cursor(request, queryset.model)
+        if key is not None:
+            queryset = queryset.filter(self.get_filter_after(key))
+
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        self.next_key = (
+            [getattr(rows[-1], field) for field in self.ordering]
+            if self.has_next
+            else None
+        )
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_filter_after(self, key):
+        """
+        Filter rows that sort after `key` in descending order i.e
+        (a, b) < (key_a, key_b). The leading `lte` lets the db
+        range scan the index instead of evaluating the OR per row.
+        """
+        condition = None
+        for field, value in reversed(list(zip(self.ordering, key))):
+            after = Q(**{f"{field}__lt": value})
+            if condition is not None:
+                after |= Q(**{field: value}) & condition
+            condition = after
+        return Q(**{f"{self.ordering[0]}__lte": key[0]}) & condition
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor())
+
+    def encode_cursor(self):
+        key = [
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in self.next_key
+        ]
+        return b64encode(json.dumps(key).encode()).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            key = json.loads(b64decode(encoded.encode()).decode())
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(key, list) or len(key) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, key)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
@@ -1,9 +1,66 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
+from django.db.models import Q
 from rest_framework.permissions import BasePermission, DjangoModelPermissions
 from rest_framework.exceptions import PermissionDenied
+from core.cache import get_versions
+
+# models whose changes can alter the permissions of a user, their
+# versions are bumped by `core.cache.connect_cache_invalidation`
+PERMISSION_MODELS = [
+    "auth.Permission",
+    "department.Department",
+    "permissions.UserTenantPermissions",
+]
+_NOT_A_MEMBER = "not a member"
+
+
+def get_tenant_permissions(user_id):
+    """
+    Return the cached authorization of a user in the current tenant,
+    as a dict of its tenant permissions `id`, `is_superuser`, `is_staff`
+    & `perms`, a frozenset of "<app_label>.<codename>" strings.
+    Return None when the user does not belong to the tenant.
+
+    The cache key holds the versions of `PERMISSION_MODELS`, so any
+    change to permissions, departments or membership rebuilds it. The
+    versions live in the shared cache (`CACHE_URL`) and are bumped again
+    once the change is committed, so every worker sees a revocation.
+    """
+    versions = ".".join(str(version) for version in get_versions(PERMISSION_MODELS))
+    key = f"permissions:{connection.schema_name}:{user_id}:{versions}"
+    state = cache.get(key)
+    if state is None:
+        UserTenantPermissions = apps.get_model("permissions.UserTenantPermissions")
+        Permission = apps.get_model("auth.Permission")
+        try:
+            tenant_perms = UserTenantPermissions.objects.get(profile_id=user_id)
+        except UserTenantPermissions.DoesNotExist:
+            state = _NOT_A_MEMBER
+        else:
+            perms = (
+                Permission.objects.filter(
+                    Q(user=tenant_perms) | Q(group__user=tenant_perms)
+                )
+                .values_list("content_type__app_label", "codename")
+                .distinct()
+            )
+            state = {
+                "id": tenant_perms.id,
+                "is_superuser": tenant_perms.is_superuser,
+                "is_staff": tenant_perms.is_staff,
+                "perms": frozenset(f"{app}.{codename}" for app, codename in perms),
+            }
+        cache.set(key, state, settings.PERMISSION_CACHE_TIMEOUT)
+    return None if state == _NOT_A_MEMBER else state
 
 
 def belongs_to_organisation(request):
+    # `tenant_perms` is built from `get_tenant_permissions`, so
+    # this costs no query once the permissions of the user are cached
     if request.user and request.user.is_authenticated:
         try:
             return bool(request.user.tenant_perms)
@@ -1,4 +1,5 @@
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
+from django.core.exceptions import ValidationError
 from django.utils.module_loading import import_string
 from rest_framework.relations import (
     PrimaryKeyRelatedField,
@@ -6,6 +7,103 @@ from rest_framework.relations import (
     MANY_RELATION_KWARGS,
     ManyRelatedField as DRFManyRelatedField,
 )
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+
+class PrimaryKeyResolver:
+    """
+    Resolve the pks of every `PrimaryKey_To_ObjectField` in the payload
+    of a root serializer with one query per field, instead of one
+    `queryset.get()` per value.
+
+    The resolver is built on the first lookup of a validation run and
+    kept on the root serializer, so it lives as long as the request.
+    Pks it could not resolve are left to the field, which then raises
+    the usual validation errors.
+    """
+
+    def __init__(self, root):
+        self.data = root.initial_data
+        self.pks = defaultdict(set)
+        self.fields = {}
+        self.querysets = {}
+        self.objects = {}
+        self.collect(root, root.initial_data)
+
+    @classmethod
+    def for_field(cls, field):
+        root = field.root
+        if getattr(root, "initial_data", None) is None:
+            return None
+        resolver = getattr(root, "_pk_resolver", None)
+        if resolver is None or resolver.data is not root.initial_data:
+            resolver = root._pk_resolver = cls(root)
+        return resolver
+
+    @staticmethod
+    def get_key(field):
+        # the fields of a list serializer child are shared by its items,
+        # so the pks of a field are batched across every item
+        return id(field)
+
+    @staticmethod
+    def to_pk(queryset, value):
+        if isinstance(value, bool):
+            return None
+        try:
+            return queryset.model._meta.pk.to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            return None
+
+    def add(self, field, values):
+        key = self.get_key(field)
+        if key not in self.querysets:
+            # keep the field alive, so its id is not reused during the run
+            self.fields[key] = field
+            self.querysets[key] = field.get_queryset()
+        queryset = self.querysets[key]
+        for value in values:
+            pk = self.to_pk(queryset, value)
+            if pk is not None:
+                self.pks[key].add(pk)
+
+    def collect(self, serializer, data):
+        if isinstance(serializer, ListSerializer):
+            if isinstance(data, list):
+                for item in data:
+                    self.collect(serializer.child, item)
+            return
+        if not hasattr(data, "get"):
+            return
+
+        for name, field in serializer.fields.items():
+            if field.read_only or name not in data:
+                continue
+            if isinstance(field, DRFManyRelatedField):
+                self.collect_many(field, name, data)
+            elif getattr(field, "batch_resolve", False):
+                self.add(field, [data[name]])
+            elif isinstance(field, BaseSerializer):
+                self.collect(field, data[name])
+
+    def collect_many(self, field, name, data):
+        child = field.child_relation
+        if not getattr(child, "batch_resolve", False):
+            return
+        values = data.getlist(name) if hasattr(data, "getlist") else data[name]
+        if isinstance(values, list):
+            self.add(child, values)
+
+    def get(self, field, value):
+        key = self.get_key(field)
+        queryset = self.querysets.get(key)
+        if queryset is None:
+            queryset = field.get_queryset()
+        if key not in self.objects:
+            pks = self.pks.pop(key, ())
+            self.objects[key] = queryset.in_bulk(pks) if pks else {}
+        pk = self.to_pk(queryset, value)
+        return self.objects[key].get(pk) if pk is not None else None
 
 
 class ReadSourceMixin:
@@ -78,22 +176,46 @@ class Related_To_ObjectFieldMixin(ReadSourceMixin):
 
         return OrderedDict([(item.pk, self.display_value(item)) for item in queryset])
 
-    def to_representation(self, data):
-        if isinstance(self.object_serializer, str):
-            self.object_serializer = import_string(self.object_serializer)
+    def get_object_serializer(self):
+        """
+        Return the `object_serializer` instance of this field, built once
+        & reused for every related object instead of building a new
+        serializer (and its fields) per object.
+        """
+        serializer = getattr(self, "_object_serializer_instance", None)
+        if serializer is None:
+            if isinstance(self.object_serializer, str):
+                self.object_serializer = import_string(self.object_serializer)
+            serializer = self.object_serializer(
+                context=self.context, **self.object_serializer_kwargs
+            )
+            self._object_serializer_instance = serializer
+        return serializer
 
-        return self.object_serializer(
-            data, context=self.context, **self.object_serializer_kwargs
-        ).data
+    def to_representation(self, data):
+        return self.get_object_serializer().to_representation(data)
 
 
 class PrimaryKey_To_ObjectField(Related_To_ObjectFieldMixin, PrimaryKeyRelatedField):
     """
     Override PrimaryKeyRelatedField to represent serializer
     data instead of a pk field of the object.
+
+    On input, pks are read from the `PrimaryKeyResolver` of the
+    root serializer. Set `batch_resolve = False` on subclasses
+    that resolve objects some other way.
     """
 
-    pass
+    batch_resolve = True
+
+    def to_internal_value(self, data):
+        if self.batch_resolve and self.pk_field is None:
+            resolver = PrimaryKeyResolver.for_field(self)
+            if resolver is not None:
+                obj = resolver.get(self, data)
+                if obj is not None:
+                    return obj
+        return super().to_internal_value(data)
 
 
 class Slug_To_ObjectField(Related_To_ObjectFieldMixin, SlugRelatedField):
@@ -34,6 +34,11 @@ class CreateUpdateRelationMixin:
     In this example, "lines" is the source of truth for all the
     related JournalEntryLine objects for the JournalEntry instance.
 
+    Relation objects are written in bulk, i.e one query each to fetch,
+    create, update & delete them, plus a DELETE & an INSERT of through
+    rows per many-to-many field. The model `save`/`delete` methods &
+    signals don't run for them, so values derived from the relation
+    (e.g invoice totals) should be refreshed after `update_relation`.
     """
 
     def update_relation(self, field_name, manager, data):
@@ -42,36 +47,71 @@ class CreateUpdateRelationMixin:
 
         relation_serializer = self.fields[field_name]
         relation_ModelClass = relation_serializer.child.Meta.model
-        updated_relations = []
+        parent_field_name = manager.field.name
+        parent = manager.instance
+        many_to_many_fields = relation_ModelClass._meta.many_to_many
 
+        relation_ids = [datum["id"] for datum in data if datum.get("id") is not None]
+        relation_objects = relation_ModelClass.objects.in_bulk(relation_ids)
+
+        created_relations, updated_relations, updated_fields = [], [], set()
+        many_to_many_data = []
         for relation_datum in data:
             assert isinstance(relation_datum, dict)
-            related_parent_field = {manager.field.name: manager.instance}
-            relation_datum.update(related_parent_field)
-
-            try:
-                if relation_datum.get("id") is None:
-                    raise relation_ModelClass.DoesNotExist
+            relation_datum = dict(relation_datum)
+            relation_object = relation_objects.get(relation_datum.pop("id", None))
+            m2m_datum = {
+                field.name: relation_datum.pop(field.name)
+                for field in many_to_many_fields
+                if field.name in relation_datum
+            }
 
-                relation_object = relation_ModelClass.objects.get(
-                    id=relation_datum["id"]
+            if relation_object is None:
+                relation_object = relation_ModelClass(
+                    **relation_datum, **{parent_field_name: parent}
                 )
-                if (
-                    relation_object.__dict__[manager.field.name + "_id"]
-                    is not manager.instance.id
-                ):
+                created_relations.append(relation_object)
+            else:
+                if getattr(relation_object, parent_field_name + "_id") != parent.id:
                     raise ValidationError("Invalid relation data.")
+                for attr, value in relation_datum.items():
+                    setattr(relation_object, attr, value)
+                updated_fields.update(relation_datum)
+                updated_relations.append(relation_object)
+            many_to_many_data.append((relation_object, m2m_datum))
 
-                updated_relation_object = relation_serializer.child.update(
-                    relation_object, relation_datum
-                )
-            except relation_ModelClass.DoesNotExist:
-                relation_datum.pop("id", None)
-                updated_relation_object = relation_serializer.child.create(
-                    relation_datum
-                )
-            updated_relations.append(updated_relation_object)
+        relation_ModelClass.objects.bulk_create(created_relations)
+        if updated_relations and updated_fields:
+            relation_ModelClass.objects.bulk_update(
+                updated_relations, sorted(updated_fields)
+            )
+        for field in many_to_many_fields:
+            self._set_many_to_many(field, many_to_many_data)
 
         if not self.partial:
-            updated_relations_ids = [rel.id for rel in updated_relations]
-            manager.exclude(id__in=updated_relations_ids).delete()
+            relation_ids = [rel.id for rel in created_relations + updated_relations]
+            # a regular delete, so cascades & delete signals still run
+            manager.exclude(id__in=relation_ids).delete()
+
+    def _set_many_to_many(self, field, many_to_many_data):
+        """
+        Replace the `field` relations of every object that has
+        data for it, with one DELETE & one INSERT of through rows.
+        """
+        through = field.remote_field.through
+        source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+        objects = [
+            obj for obj, m2m_datum in many_to_many_data if field.name in m2m_datum
+        ]
+        if not objects:
+            return
+        through.objects.filter(**{source + "__in": objects}).delete()
+        through.objects.bulk_create(
+            [
+                through(**{source: obj, target: related_object})
+                for obj, m2m_datum in many_to_many_data
+                if field.name in m2m_datum
+                for related_object in m2m_datum[field.name]
+            ],
+            ignore_conflicts=True,
+        )
@@ -1,6 +1,8 @@
 from pathlib import Path
 from decouple import config, Csv
 from datetime import timedelta
+from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -55,12 +57,13 @@ TENANT_APPS = [
     "apps.purchase.vendor",
     "apps.purchase.bill",
     "apps.purchase.expense",
+    "apps.sync",
 ]
 
 INSTALLED_APPS = list(SHARED_APPS) + [app for app in TENANT_APPS if app not in SHARED_APPS]
 
 MIDDLEWARE = [
-    "django_tenants.middleware.TenantSubfolderMiddleware",
+    "core.middleware.CachedTenantSubfolderMiddleware",
     # "django_tenants.middleware.main.TenantMainMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -169,10 +172,16 @@ TENANT_USERS_DOMAIN = config("APP_DOMAIN_NAME", default="localhost")
 TENANT_SUBFOLDER_PREFIX = "org"
 TENANT_MODEL = "organisation.Tenant"
 TENANT_DOMAIN_MODEL = "organisation.Domain"
+# see `core.middleware.CachedTenantSubfolderMiddleware`
+TENANT_CACHE_TIMEOUT = 60 * 60
+TENANT_NOT_FOUND_CACHE_TIMEOUT = 30
 BASE_TENANT_SLUG = config("BASE_TENANT_SLUG", default="acme")
 BASE_TENANT_OWNER_EMAIL = config("BASE_TENANT_OWNER_EMAIL", default="meta@localhost")
 
-AUTHENTICATION_BACKENDS = ("tenant_users.permissions.backend.UserBackend",)
+AUTHENTICATION_BACKENDS = ("core.backends.CachedUserBackend",)
+# see `core.permissions.get_tenant_permissions`, kept short as a
+# safety net in case an invalidation is missed
+PERMISSION_CACHE_TIMEOUT = 5 * 60
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -219,5 +228,47 @@ PERMISSION_CATEGORIES = {
     ],
 }
 
+# Redis in production, in-process memory otherwise (e.g tests).
+# Cache versions must be shared by every worker for invalidation to
+# reach them all, so a per-process cache is only allowed in debug.
+CACHE_URL = config("CACHE_URL", default="")
+if not CACHE_URL and not DEBUG:
+    raise ImproperlyConfigured("CACHE_URL must be set when DEBUG is off.")
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+        if CACHE_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
+}
+# see `apps.accounting.cache`
+CHART_OF_ACCOUNTS_TIMEOUT = 5 * 60
+RESPONSE_CACHE_TIMEOUT = config("RESPONSE_CACHE_TIMEOUT", default=60 * 60, cast=int)
+
+# deleted rows are reported to sync clients for this long
+SYNC_TOMBSTONE_RETENTION = timedelta(days=90)
+SYNC_TOKEN_OVERLAP = timedelta(seconds=30)
+
 CELERY_BROKER_URL = config("REDIS_URL", default="redis://localhost:6379/")
 CELERY_RESULT_BACKEND = config("CELERY_RESULT_BACKEND", default="django-db")
+CELERY_BEAT_SCHEDULE = {
+    "take-balance-snapshots": {
+        "task": "apps.accounting.tasks.take_balance_snapshots",
+        "schedule": crontab(hour=0, minute=5),
+    },
+    "mark-overdue-invoices": {
+        "task": "apps.sales.invoice.tasks.mark_overdue_invoices",
+        "schedule": crontab(hour=0, minute=1),
+    },
+    "mark-overdue-bills": {
+        "task": "apps.purchase.bill.tasks.mark_overdue_bills",
+        "schedule": crontab(hour=0, minute=1),
+    },
+    "prune-tombstones": {
+        "task": "apps.sync.tasks.prune_tombstones",
+        "schedule": crontab(hour=0, minute=10),
+    },
+}
@@ -25,6 +25,7 @@ from apps.inventory.item.views import ItemViewSet
 from apps.inventory.item.views import ServiceViewSet
 from apps.tax.views import TaxViewSet
 from apps.accounting.views import AccountViewSet, JournalEntryViewSet
+from apps.sync.views import SyncView
 
 
 @api_view()
@@ -40,6 +41,7 @@ urlpatterns = [
     # auth
     path("auth/login/", TokenObtainPairView.as_view(), name="jwt-login"),
     path("auth/refresh/", TokenRefreshView.as_view(), name="jwt-refresh"),
+    path("sync/", SyncView.as_view(), name="sync"),
 ]
 
 router = SimpleRouter()
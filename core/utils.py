@@ -1,16 +1,91 @@
-def get_next_number(model, prefix):
+from decimal import Decimal
+from functools import wraps
+from django.db import connection, migrations
+from django.db.models import DecimalField, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def _number_sequence(prefix):
+    return f"{prefix.lower()}_number_seq"
+
+
+def get_next_number(prefix):
     """
     Generate a valid value for the `number` parameter
     of a model object e.g Invoice, Bill, JournalEntry etc.
 
-    This value is calculated as an increment of 1
-    from the id of the latest object in db for the model.
+    This value is drawn from the `<prefix>_number_seq` sequence in
+    the tenant schema (see `create_number_sequence`), so concurrent
+    creates never get the same number and no table is read.
 
     returns e.g B-000012, INV-000342, JNL-000005
     """
-    try:
-        latest_object = model._default_manager.latest("id")
-        next_number = latest_object.id + 1
-        return f"{prefix}-{next_number:06d}"
-    except model.DoesNotExist:
-        return f"{prefix}-000001"
+    return reserve_numbers(prefix, 1)[0]
+
+
+def reserve_numbers(prefix, count):
+    """
+    Draw `count` numbers from the `<prefix>_number_seq` sequence in one
+    query, for creating many objects at once.
+
+    returns e.g ["INV-000343", "INV-000344", "INV-000345"]
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(%s) FROM generate_series(1, %s)",
+            [_number_sequence(prefix), count],
+        )
+        return [f"{prefix}-{value:06d}" for (value,) in cursor.fetchall()]
+
+
+def create_number_sequence(prefix, table):
+    """
+    Migration operation creating the number sequence of `prefix`,
+    starting after the highest number already stored in `table`.
+    """
+    sequence = _number_sequence(prefix)
+    return migrations.RunSQL(
+        sql=[
+            f"CREATE SEQUENCE IF NOT EXISTS {sequence}",
+            f"SELECT setval('{sequence}', COALESCE(MAX("
+            f"CAST(substring(number from '[0-9]+$') AS bigint)), 0) + 1, false) "
+            f"FROM {table}",
+        ],
+        reverse_sql=f"DROP SEQUENCE IF EXISTS {sequence}",
+    )
+
+
+def sum_subquery(queryset, group_by, expression):
+    """
+    Sum `expression` over `queryset` grouped by the `group_by` field,
+    for use as a correlated subquery annotation. Gives 0 when no row matches.
+
+    e.g
+    sum_subquery(InvoiceLine.objects.filter(invoice=OuterRef("pk")), "invoice", F("rate"))
+    """
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values(group_by)
+            .annotate(total=Sum(expression))
+            .values("total")
+        ),
+        Value(Decimal(0)),
+        output_field=DecimalField(),
+    )
+
+
+def memoized_property(method):
+    """
+    A property computed once per instance & kept in the instance's
+    `_cache` dict, until the instance clears it with `_cache.clear()`.
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def getter(self):
+        if name not in self._cache:
+            self._cache[name] = method(self)
+        return self._cache[name]
+
+    return property(getter)
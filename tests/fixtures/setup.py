@@ -1,6 +1,7 @@
 import pytest
 import contextlib
 from django.conf import settings
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APIClient
 from django_tenants.utils import schema_context
@@ -20,6 +21,11 @@ TEST_TENANT_SLUG = "test"
 TENANT_SUBFOLDER_PREFIX = getattr(settings, "TENANT_SUBFOLDER_PREFIX", None)
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 @pytest.fixture()
 def client(test_user):
     api_client = CustomAPIClient(subfolder_tenancy=True, SERVER_NAME=CLIENT_DOMAIN_NAME)
@@ -1,7 +1,25 @@
 import pytest
+import json
+from base64 import b64encode
+from datetime import date
+from urllib.parse import urlsplit
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
 from django.contrib.contenttypes.models import ContentType
-from apps.accounting.models import Transaction, get_journal_next_number
+from apps.accounting import cache
+from apps.accounting import reports
+from apps.accounting.factory import AccountingFactory
+from apps.accounting.models import (
+    Account,
+    AccountBalance,
+    AccountBalanceSnapshot,
+    Transaction,
+    get_journal_next_number,
+)
+from mixer.backend.django import mixer
 
 
 @pytest.mark.django_db()
@@ -91,10 +109,11 @@ def test_crud_journal_entry(client, test_user, journal_data, invalid_journal_dat
     test_user.add_permissions("add_journalentry", "view_journalentry")
 
     # create
-    next_number = get_journal_next_number()
+    # numbers are drawn from a sequence, so a drawn number is never reused
+    drawn_number = get_journal_next_number()
     res = client.post(url, journal_data, format="json")
     assert res.status_code == 201
-    assert res.data["number"] == next_number
+    assert res.data["number"] == f"JNL-{int(drawn_number[4:]) + 1:06d}"
     assert float(res.data["amount"]) == journal_data["lines"][0]["amount"]
 
     # test transaction, journal entry is draft so transaction should not exist
@@ -145,3 +164,265 @@ def test_crud_journal_entry(client, test_user, journal_data, invalid_journal_dat
     assert res.status_code == 405
     res = client.delete(url)
     assert res.status_code == 405
+
+
+@pytest.mark.django_db
+def test_account_balances(client, test_user, test_tenant, journal_data):
+    test_user.add_permissions("add_journalentry", "view_account")
+    url = reverse("journal-entry-list")
+    res = client.post(url, {**journal_data, "is_draft": False}, format="json")
+    assert res.status_code == 201
+
+    bank = Account.objects.get(code="1000-1")
+    url = reverse("account-balance")
+    res = client.get(url)
+    assert res.status_code == 200
+    assert res.data[bank.id] == 5_000
+
+    # rebuilding from raw transactions should agree with the running balances
+    call_command("rebuild_balances", test_tenant.schema_name, "--verify")
+    AccountBalance.objects.filter(account=bank).update(amount=0)
+    with pytest.raises(CommandError):
+        call_command("rebuild_balances", test_tenant.schema_name, "--verify")
+    call_command("rebuild_balances", test_tenant.schema_name)
+    assert AccountBalance.objects.get(account=bank).amount == 5_000
+
+
+@pytest.mark.django_db
+def test_record_transaction(client, taxes):
+    bill_line = mixer.blend("bill.BillLine", rate=10_000, quantity=2)
+    bill_line.taxes.set(taxes)
+    bill = bill_line.bill
+    bill.refresh_from_db()
+
+    # bill postings should balance, one row per line
+    Transaction.objects.record_bill(bill)
+    records = Transaction.objects.filter(ref_id=bill.id, ref_type__model="bill")
+    assert records.count() == 2 + len(taxes)
+    debits = sum(r.amount for r in records if r.type == "debit")
+    credits = sum(r.amount for r in records if r.type == "credit")
+    assert debits == credits == bill.total_incl_tax
+
+    # unbalanced & unknown accounts are rejected before anything is written
+    transaction_data = {
+        "date": bill.bill_date,
+        "ref": bill,
+        "name": "Unbalanced",
+        "note": "",
+        "transactions": [
+            {"account_code": "2000", "type": "credit", "amount": 100},
+            {"account_code": "6014", "type": "debit", "amount": 90},
+        ],
+    }
+    with pytest.raises(ValidationError):
+        Transaction.objects._record_transaction(**transaction_data)
+    transaction_data["transactions"][1].update(account_code="0000", amount=100)
+    with pytest.raises(ValidationError):
+        Transaction.objects._record_transaction(**transaction_data)
+    assert records.count() == 2 + len(taxes)
+
+
+@pytest.mark.django_db
+def test_record_transaction_only_writes_changes(client):
+    payment = mixer.blend("invoice.PaymentReceived", amount=5_000)
+    Transaction.objects.record_payment_received(payment)
+    records = Transaction.objects.filter(
+        ref_id=payment.id, ref_type__model="paymentreceived"
+    )
+    record_ids = set(records.values_list("id", flat=True))
+
+    # re-posting an unchanged resource issues no writes
+    with CaptureQueriesContext(connection) as ctx:
+        Transaction.objects.record_payment_received(payment)
+    writes = [
+        query["sql"]
+        for query in ctx.captured_queries
+        if query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+    ]
+    assert writes == []
+
+    # changed amounts are updated in place
+    payment.amount = 7_000
+    Transaction.objects.record_payment_received(payment)
+    assert set(records.values_list("id", flat=True)) == record_ids
+    assert {abs(amount) for amount in records.values_list("amount", flat=True)} == {
+        7_000
+    }
+    bank = Account.objects.get(code="1000-1")
+    assert AccountBalance.objects.get(account=bank).amount == 7_000
+
+
+@pytest.mark.django_db
+def test_default_accounts_invalidate_cached_responses(client, test_user):
+    test_user.add_permissions("view_account")
+    url = reverse("account-list")
+
+    def list_accounts():
+        with CaptureQueriesContext(connection) as context:
+            assert client.get(url).status_code == 200
+        queries = [query["sql"] for query in context.captured_queries]
+        # the account rows themselves, not the etag aggregate
+        return any('"accounting_account"."code"' in sql for sql in queries)
+
+    assert list_accounts()
+    assert not list_accounts()
+    # bulk created accounts send no signals
+    AccountingFactory(connection.schema_name).generate_default_accounts()
+    assert list_accounts()
+
+
+@pytest.mark.django_db
+def test_chart_of_accounts_cache(client, settings, django_assert_num_queries):
+    receivable = Account.objects.select_related("sub_type").get(code="1200")
+    cache.get_chart()
+    with django_assert_num_queries(0):
+        assert cache.get_accounts_by_code(["1200"])["1200"].id == receivable.id
+        assert cache.get_account(receivable.id).type == receivable.sub_type.type
+
+    # saving an account drops the cached chart
+    receivable.name = "Receivables"
+    receivable.save()
+    assert cache.get_account(receivable.id).name == "Receivables"
+    receivable.is_archived = True
+    receivable.save()
+    assert cache.get_accounts_by_code(["1200"], active_only=True) == {}
+
+    # lookups never share a model instance, and the chart expires
+    assert cache.get_account(receivable.id) is not cache.get_account(receivable.id)
+    settings.CHART_OF_ACCOUNTS_TIMEOUT = 0
+    with django_assert_num_queries(2):
+        cache.get_chart()
+
+
+@pytest.mark.django_db
+def test_trial_balance(client, test_user, journal_data):
+    test_user.add_permissions("add_journalentry", "view_account")
+    url = reverse("journal-entry-list")
+    res = client.post(url, {**journal_data, "is_draft": False}, format="json")
+    assert res.status_code == 201
+
+    url = reverse("account-trial-balance")
+    res = client.get(url)
+    assert res.status_code == 200
+    accounts = {account["code"]: account for account in res.data["accounts"]}
+    # sub account totals are rolled up into the parent account
+    assert accounts["1000-1"]["debit"] == accounts["1000"]["debit"] == 5_000
+    assert accounts["3001-1"]["credit"] == accounts["3001"]["credit"] == 5_000
+    assert res.data["total"]["debit"] == res.data["total"]["credit"] == 5_000
+
+    res = client.get(url, {"from": "2000-01-01", "to": "2000-12-31"})
+    assert res.status_code == 200
+    assert res.data["accounts"] == []
+    res = client.get(url, {"from": "2000-12-31", "to": "2000-01-01"})
+    assert res.status_code == 400
+
+
+@pytest.mark.django_db
+def test_balance_snapshots_and_reports(client, test_user):
+    bank = Account.objects.get(code="1000-1")
+
+    def receive_payment(amount, day):
+        payment = mixer.blend("invoice.PaymentReceived", amount=amount, date=day)
+        Transaction.objects.record_payment_received(payment)
+        return payment
+
+    receive_payment(5_000, date(2023, 5, 19))
+    AccountBalanceSnapshot.objects.take(date(2023, 6, 1))
+    assert AccountBalanceSnapshot.objects.get(account=bank).amount == 5_000
+
+    # back-dated postings adjust later snapshots
+    back_dated = receive_payment(2_000, date(2023, 5, 1))
+    assert AccountBalanceSnapshot.objects.get(account=bank).amount == 7_000
+    receive_payment(3_000, date(2023, 6, 10))
+    assert reports.balances_as_of(date(2023, 6, 5))[bank.id] == 7_000
+    assert reports.balances_as_of(date(2023, 6, 30))[bank.id] == 10_000
+    assert reports.balances_as_of(date(2023, 5, 10))[bank.id] == 2_000
+    Transaction.objects.delete_resource(back_dated)
+    assert AccountBalanceSnapshot.objects.get(account=bank).amount == 5_000
+
+    invoice_line = mixer.blend("invoice.InvoiceLine", rate=1_000, quantity=2)
+    invoice = invoice_line.invoice
+    invoice.refresh_from_db()
+    invoice.issued_date = date(2023, 6, 15)
+    Transaction.objects.record_invoice(invoice)
+
+    test_user.add_permissions("view_account")
+    url = reverse("account-balance-sheet")
+    res = client.get(url, {"to": "2023-06-30"})
+    assert res.status_code == 200
+    assert res.data["asset"]["total"] == res.data["total_liabilities_and_equity"]
+    assert res.data["net_income"] == 2_000
+
+    url = reverse("account-income-statement")
+    res = client.get(url, {"from": "2023-06-01", "to": "2023-06-30"})
+    assert res.status_code == 200
+    assert res.data["income"]["total"] == res.data["net_income"] == 2_000
+    res = client.get(url, {"from": "2023-07-01", "to": "2023-07-31"})
+    assert res.data["net_income"] == 0
+
+
+@pytest.mark.django_db
+def test_account_transactions_pagination(client, test_user):
+    bank = Account.objects.get(code="1000-1")
+    for day in [1, 2, 2, 2, 3]:
+        payment = mixer.blend(
+            "invoice.PaymentReceived", amount=100 * day, date=date(2023, 5, day)
+        )
+        Transaction.objects.record_payment_received(payment)
+
+    test_user.add_permissions("view_account")
+    url = reverse("account-transactions", kwargs={"pk": bank.pk})
+    res = client.get(url, {"page_size": 2})
+    assert res.status_code == 200
+    ids = [transaction["id"] for transaction in res.data["results"]]
+    while res.data["next"]:
+        # the test client adds the tenant prefix, so follow the query only
+        res = client.get(url + "?" + urlsplit(res.data["next"]).query)
+        assert res.status_code == 200
+        ids += [transaction["id"] for transaction in res.data["results"]]
+    expected = bank.transactions.order_by("-date", "-id").values_list("id", flat=True)
+    assert ids == list(expected)
+
+    res = client.get(url, {"from": "2023-05-02", "to": "2023-05-02"})
+    assert len(res.data["results"]) == 3
+    assert res.data["next"] is None
+    res = client.get(url, {"cursor": "not-a-cursor"})
+    assert res.status_code == 404
+    # a valid cursor of the wrong length
+    res = client.get(url, {"cursor": b64encode(b'["2023-05-02"]').decode()})
+    assert res.status_code == 404
+
+
+@pytest.mark.django_db
+def test_general_ledger(client, test_user):
+    bank = Account.objects.get(code="1000-1")
+    for amount, day in [(1_000, 1), (500, 2), (250, 3)]:
+        payment = mixer.blend(
+            "invoice.PaymentReceived", amount=amount, date=date(2023, 5, day)
+        )
+        Transaction.objects.record_payment_received(payment)
+
+    test_user.add_permissions("view_account")
+    url = reverse("account-ledger", kwargs={"pk": bank.pk})
+    res = client.get(url, {"from": "2023-05-02"})
+    assert res.status_code == 200
+    ledger = json.loads(b"".join(res.streaming_content))
+    assert ledger["opening_balance"] == 1_000
+    assert [row["balance"] for row in ledger["transactions"]] == [1_500, 1_750]
+    assert ledger["closing_balance"] == 1_750
+
+
+@pytest.mark.django_db
+def test_export_transactions(client, test_user):
+    payment = mixer.blend(
+        "invoice.PaymentReceived", amount=1_000, date=date(2023, 5, 1)
+    )
+    Transaction.objects.record_payment_received(payment)
+
+    test_user.add_permissions("view_account")
+    url = reverse("account-export-transactions")
+    res = client.get(url, {"fmt": "ndjson", "from": "2023-05-01", "to": "2023-05-01"})
+    assert res.status_code == 200
+    rows = [json.loads(row) for row in b"".join(res.streaming_content).splitlines()]
+    assert {row["account_code"] for row in rows} == {"1000-1", "1200"}
+    assert all(row["ref_id"] == payment.id for row in rows)
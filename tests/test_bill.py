@@ -1,8 +1,10 @@
 import pytest
+import json
+from decimal import Decimal
 from django.urls import reverse
 from django.contrib.contenttypes.models import ContentType
 from apps.accounting.models import Transaction
-from apps.purchase.bill.models import BillStatus, get_bill_next_number
+from apps.purchase.bill.models import Bill, BillStatus, get_bill_next_number
 from mixer.backend.django import mixer
 
 
@@ -17,12 +19,13 @@ def test_create_list_bill(client, test_user, bill_data):
 
     test_user.add_permissions("add_bill", "view_bill", "view_transation")
     # create
-    next_number = get_bill_next_number()
+    # numbers are drawn from a sequence, so a drawn number is never reused
+    drawn_number = get_bill_next_number()
     res = client.post(url, bill_data, format="json")
     assert res.status_code == 201
-    assert res.data["number"] == next_number
+    assert res.data["number"] == f"B-{int(drawn_number[2:]) + 1:06d}"
     assert len(res.data["lines"]) == len(bill_data["lines"])
-    next_number = get_bill_next_number()
+    next_number = f"B-{int(res.data['number'][2:]) + 1:06d}"
     res = client.post(url, bill_data, format="json")
     assert res.data["number"] == next_number
 
@@ -43,6 +46,15 @@ def test_create_list_bill(client, test_user, bill_data):
     res = client.get(url)
     assert res.status_code == 200
 
+    # export
+    url = reverse("bill-export")
+    res = client.get(url, {"fmt": "ndjson"})
+    assert res.status_code == 200
+    rows = [json.loads(row) for row in b"".join(res.streaming_content).splitlines()]
+    assert {row["id"] for row in rows} == {bill_id, bill_id - 1}
+    res = client.get(url, {"fmt": "xml"})
+    assert res.status_code == 400
+
     # total outstanding
     url = reverse("bill-outstanding")
     res = client.get(url)
@@ -223,3 +235,18 @@ def test_bill_status_update(client, test_user):
     assert res.status_code == 204
     bill.refresh_from_db()
     assert bill.status == BillStatus.PARTLY_PAID
+
+
+@pytest.mark.django_db
+def test_bill_paid_with_rounded_tax(client):
+    # 100.01 + 7.5% tax = 107.51075, shown & stored as 107.51
+    tax = mixer.blend("tax.Tax", rate=7.5)
+    line = mixer.blend("bill.BillLine", rate="100.01", quantity=1)
+    line.taxes.add(tax)
+    bill = Bill.objects.get(pk=line.bill_id)
+    assert bill.amount_due == Decimal("107.51")
+
+    mixer.blend("bill.PaymentMade", bill=bill, amount="107.51")
+    bill.refresh_from_db()
+    assert bill.amount_due == 0
+    assert bill.status == BillStatus.PAID
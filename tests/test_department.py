@@ -1,5 +1,8 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from mixer.backend.django import mixer
 from apps.department.models import Department
 
 
@@ -183,3 +186,42 @@ def test_list_non_memeber(client, test_user, dept_object):
     test_user.add_permissions("view_department")
     res = client.get(url)
     assert res.status_code == 200
+
+
+@pytest.mark.django_db
+def test_list_depts_query_count(client, test_user, create_tenant_user):
+    test_user.add_permissions("view_department")
+    url = reverse("department-list")
+
+    def list_depts(count):
+        for i in range(count):
+            dept = mixer.blend("department.Department", heads=[test_user])
+            dept.add_members([create_tenant_user(f"member-{count}-{i}@example.com")])
+            dept.add_permissions("view_invoice", "change_invoice")
+        with CaptureQueriesContext(connection) as context:
+            res = client.get(url)
+        assert res.status_code == 200
+        assert all(len(dept["members"]) == 1 for dept in res.data)
+        assert all(
+            len(dept["permissions"]["sales"]["invoice"]) == 2 for dept in res.data
+        )
+        return len(context.captured_queries)
+
+    # a page costs the same number of queries however many departments it holds
+    client.get(url)
+    assert list_depts(2) == list_depts(5)
+
+
+@pytest.mark.django_db
+def test_non_members_excludes_members(
+    client, test_user, dept_object, create_tenant_user
+):
+    test_user.add_permissions("view_department")
+    member = create_tenant_user("member@example.com")
+    dept_object.add_members([member])
+    url = reverse("department-non-members", kwargs={"pk": dept_object.pk})
+    res = client.get(url)
+    assert res.status_code == 200
+    user_ids = {user["id"] for user in res.data}
+    assert test_user.id in user_ids
+    assert member.id not in user_ids
@@ -1,3 +1,5 @@
+import csv
+import io
 import pytest
 from django.urls import reverse
 from django.contrib.contenttypes.models import ContentType
@@ -25,6 +27,11 @@ def test_create_list_expense(client, test_user, expense_object, expense_data):
     # list
     res = client.get(url)
     assert res.status_code == 200
+    # export
+    res = client.get(reverse("expense-export"))
+    assert res.status_code == 200
+    rows = list(csv.reader(io.StringIO(b"".join(res.streaming_content).decode())))
+    assert len(rows) == 3
 
     url = reverse("expense-detail", kwargs={"pk": expense_object.pk})
     # no permissions
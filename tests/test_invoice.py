@@ -1,8 +1,23 @@
+import csv
+import io
 import pytest
+import time
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from django.core.management import CommandError, call_command
 from django.contrib.contenttypes.models import ContentType
 from apps.accounting.models import Transaction
-from apps.sales.invoice.models import InvoiceStatus, get_invoice_next_number
+from apps.sales.invoice.models import Invoice, InvoiceStatus, get_invoice_next_number
+from apps.sales.client.serializers import ClientSerializer
+from apps.sales.invoice.serializers import InvoiceSerializer
+from apps.tax.serializers import TaxSerializer
+from apps.sales.invoice.tasks import mark_overdue_invoices
+from core.utils import reserve_numbers
 from mixer.backend.django import mixer
 
 
@@ -21,12 +36,13 @@ def test_create_list_invoice(
 
     test_user.add_permissions("add_invoice", "view_invoice", "view_transation")
     # create
-    next_number = get_invoice_next_number()
+    # numbers are drawn from a sequence, so a drawn number is never reused
+    drawn_number = get_invoice_next_number()
     res = client.post(url, invoice_data, format="json")
     assert res.status_code == 201
-    assert res.data["number"] == next_number
+    assert res.data["number"] == f"INV-{int(drawn_number[4:]) + 1:06d}"
     assert len(res.data["lines"]) == len(invoice_data["lines"])
-    next_number = get_invoice_next_number()
+    next_number = f"INV-{int(res.data['number'][4:]) + 1:06d}"
     res = client.post(url, invoice_data, format="json")
     assert res.data["number"] == next_number
 
@@ -47,6 +63,15 @@ def test_create_list_invoice(
     res = client.get(url)
     assert res.status_code == 200
 
+    # export
+    url = reverse("invoice-export")
+    res = client.get(url)
+    assert res.status_code == 200
+    assert res["Content-Type"] == "text/csv"
+    rows = list(csv.reader(io.StringIO(b"".join(res.streaming_content).decode())))
+    assert rows[0][:3] == ["id", "number", "client"]
+    assert len(rows) == 3
+
     # total outstanding
     url = reverse("invoice-outstanding")
     res = client.get(url)
@@ -230,3 +255,348 @@ def test_invoice_status_update(client, test_user):
     assert res.status_code == 204
     invoice.refresh_from_db()
     assert invoice.status == InvoiceStatus.PARTLY_PAID
+
+
+@pytest.mark.django_db
+def test_invoice_outstanding(client, django_assert_num_queries):
+    tax = mixer.blend("tax.Tax", rate=7.5)
+    for is_draft, due_date in [
+        (True, None),
+        (False, None),
+        (False, date(2000, 1, 1)),
+        (False, date(2000, 1, 1)),
+    ]:
+        invoice = mixer.blend(
+            "invoice.Invoice", is_draft=is_draft, due_date=due_date, archived=False
+        )
+        for _ in range(2):
+            line = mixer.blend(
+                "invoice.InvoiceLine", invoice=invoice, rate=100, quantity=1
+            )
+            line.taxes.add(tax)
+        mixer.blend("invoice.PaymentReceived", invoice=invoice, amount=10)
+    paid = mixer.blend("invoice.InvoiceLine", rate=100, quantity=1).invoice
+    mixer.blend("invoice.PaymentReceived", invoice=paid, amount=100)
+
+    expected = {"draft": 0, "overdue": 0, "total": 0}
+    for invoice in Invoice.objects.filter(archived=False):
+        if invoice.is_draft:
+            expected["draft"] += invoice.amount_due
+            continue
+        if invoice.is_overdue:
+            expected["overdue"] += invoice.amount_due
+        expected["total"] += invoice.amount_due
+
+    with django_assert_num_queries(1):
+        outstanding = Invoice.objects.get_outstanding()
+    assert outstanding == expected
+    assert outstanding["overdue"] > 0
+
+
+@pytest.mark.django_db
+def test_invoice_totals(client, test_user):
+    tax = mixer.blend("tax.Tax", rate=10)
+    invoice = mixer.blend("invoice.Invoice")
+    line = mixer.blend("invoice.InvoiceLine", invoice=invoice, rate=100, quantity=2)
+    line.taxes.add(tax)
+    payment = mixer.blend("invoice.PaymentReceived", invoice=invoice, amount=50)
+    invoice.refresh_from_db()
+    assert invoice.total_incl_tax == 220
+    assert invoice.taxes_total == 20
+    assert invoice.amount_paid == 50
+    assert invoice.amount_due == 170
+
+    # totals follow changes to taxes, lines & payments
+    tax.rate = 5
+    tax.save()
+    payment.delete()
+    mixer.blend("invoice.InvoiceLine", invoice=invoice, rate=10, quantity=1)
+    invoice.refresh_from_db()
+    assert invoice.total_incl_tax == invoice.amount_due == 220
+    # saving a stale instance does not overwrite the totals
+    stale = Invoice.objects.get(pk=invoice.pk)
+    line.delete()
+    stale.save()
+    stale.refresh_from_db()
+    assert stale.total_incl_tax == 10
+
+    test_user.add_permissions("view_invoice")
+    res = client.get(reverse("invoice-list"), {"ordering": "-amount_due"})
+    assert res.status_code == 200
+    assert res.data[0]["id"] == invoice.id
+
+    Invoice.objects.filter(pk=invoice.pk).update(amount_due=0)
+    with pytest.raises(CommandError):
+        call_command("refresh_invoice_totals", connection.schema_name, "--verify")
+    call_command("refresh_invoice_totals", connection.schema_name)
+    call_command("refresh_invoice_totals", connection.schema_name, "--verify")
+
+
+@pytest.mark.django_db
+def test_list_invoices_query_count(client, test_user):
+    test_user.add_permissions("view_invoice")
+    tax = mixer.blend("tax.Tax")
+    url = reverse("invoice-list")
+
+    def list_invoices(count):
+        for _ in range(count):
+            line = mixer.blend("invoice.InvoiceLine", rate=10, quantity=1)
+            line.taxes.add(tax)
+        with CaptureQueriesContext(connection) as context:
+            res = client.get(url)
+        assert res.status_code == 200
+        assert all(invoice["total_items"] == 1 for invoice in res.data)
+        return len(context.captured_queries)
+
+    # a page costs the same number of queries however many invoices it holds
+    # (once the permissions of the user are cached)
+    client.get(url)
+    assert list_invoices(2) == list_invoices(5)
+
+
+@pytest.mark.django_db
+def test_invoice_cached_values(client, django_assert_num_queries):
+    tax = mixer.blend("tax.Tax", name="VAT", rate=10)
+    line = mixer.blend("invoice.InvoiceLine", rate=100, quantity=1)
+    line.taxes.add(tax)
+    invoice = Invoice.objects.get(pk=line.invoice_id)
+
+    with django_assert_num_queries(2):
+        # lines & their taxes are fetched once
+        assert invoice.total_items == 1
+        assert invoice.generate_each_tax_total() == {"VAT": 10}
+        assert invoice.status == invoice.status
+        assert invoice.all_lines() is invoice.all_lines()
+
+    # mutations through related objects refresh the invoice in memory
+    mixer.blend("invoice.InvoiceLine", invoice=invoice, rate=100, quantity=1)
+    assert invoice.total_items == 2
+    assert invoice.amount_due == 210
+    mixer.blend("invoice.PaymentReceived", invoice=invoice, amount=210)
+    assert invoice.status == InvoiceStatus.PAID
+
+
+@pytest.mark.django_db
+def test_invoice_nested_representation(client, taxes):
+    address = mixer.blend("address.Address")
+    for _ in range(3):
+        line = mixer.blend(
+            "invoice.InvoiceLine",
+            invoice__client__shipping_address=address,
+            rate=100,
+            quantity=1,
+        )
+        line.taxes.set(taxes)
+
+    # the nested serializers are built once per field & reused for every row
+    data = InvoiceSerializer(Invoice.objects.order_by("id"), many=True).data
+    for invoice, invoice_data in zip(Invoice.objects.order_by("id"), data):
+        assert invoice_data["client"] == ClientSerializer(invoice.client).data
+        line_data = invoice_data["lines"][0]
+        assert sorted(line_data["taxes"], key=lambda tax: tax["id"]) == sorted(
+            TaxSerializer(taxes, many=True).data, key=lambda tax: tax["id"]
+        )
+
+
+@pytest.mark.django_db
+def test_invoice_conditional_get(client, test_user, invoice_object):
+    test_user.add_permissions("view_invoice")
+    url = reverse("invoice-detail", kwargs={"pk": invoice_object.pk})
+    res = client.get(url)
+    assert res.status_code == 200
+    etag = res["ETag"]
+    # the etag alone validates responses, see `ConditionalGetMixin`
+    assert not res.has_header("Last-Modified")
+
+    with CaptureQueriesContext(connection) as context:
+        res = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 304
+    assert res["ETag"] == etag
+    # the lines are not fetched for the serializer
+    assert not any(
+        'FROM "invoice_invoiceline"' in q["sql"] for q in context.captured_queries
+    )
+
+    # a change to a nested object yields a new etag
+    invoice_object.client.save()
+    res = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert res["ETag"] != etag
+
+    # so does a change to the salesperson, a shared model
+    invoice_object.salesperson = test_user
+    invoice_object.save()
+    etag = client.get(url)["ETag"]
+    test_user.save(update_fields=["last_login"])
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    test_user.first_name = "Salesperson"
+    test_user.save()
+    res = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert res["ETag"] != etag
+
+    url = reverse("invoice-list")
+    res = client.get(url)
+    etag = res["ETag"]
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert (
+        client.get(url, {"status": "paid"}, HTTP_IF_NONE_MATCH=etag).status_code == 200
+    )
+    mixer.blend("invoice.Invoice")
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    # deleted rows are not missed by clients revalidating by date
+    res = client.get(url)
+    etag = res["ETag"]
+    Invoice.objects.filter(pk=invoice_object.pk).delete()
+    res = client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+    assert res.status_code == 200
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_invoice_status_filter_and_overdue(client, test_user):
+    line = mixer.blend("invoice.InvoiceLine", rate=100, quantity=1)
+    invoice = Invoice.objects.get(pk=line.invoice_id)
+    assert invoice.status == InvoiceStatus.DRAFT
+    invoice.mark_as_sent()
+    invoice.due_date = timezone.localdate()
+    invoice.save()
+    assert Invoice.objects.get(pk=invoice.pk).status == InvoiceStatus.SENT
+
+    # the due date passes
+    Invoice.objects.filter(pk=invoice.pk).update(due_date=date(2000, 1, 1))
+    mark_overdue_invoices()
+    assert Invoice.objects.get(pk=invoice.pk).status == InvoiceStatus.OVERDUE
+
+    test_user.add_permissions("view_invoice")
+    url = reverse("invoice-list")
+    res = client.get(url, {"status": InvoiceStatus.OVERDUE})
+    assert [row["id"] for row in res.data] == [invoice.id]
+    res = client.get(url, {"status": InvoiceStatus.PAID})
+    assert res.data == []
+    res = client.get(reverse("invoice-counts"))
+    assert res.data[InvoiceStatus.OVERDUE] == 1
+
+    mixer.blend("invoice.PaymentReceived", invoice=invoice, amount=100)
+    assert Invoice.objects.get(pk=invoice.pk).status == InvoiceStatus.PAID
+
+
+@pytest.mark.django_db
+def test_invoice_status_from_stored_totals(client):
+    invoice = mixer.blend("invoice.Invoice", is_draft=False)
+    assert Invoice.objects.get(pk=invoice.pk).status == InvoiceStatus.SENT
+    mixer.blend("invoice.InvoiceLine", invoice=invoice, rate=100, quantity=1)
+
+    # an edit from a stale instance keeps the status of the stored totals
+    stale = Invoice.objects.get(pk=invoice.pk)
+    mixer.blend("invoice.PaymentReceived", invoice=invoice, amount=100)
+    stale.notes = "paid by transfer"
+    stale.save()
+    assert stale.status == InvoiceStatus.PAID
+    assert Invoice.objects.get(pk=invoice.pk).status == InvoiceStatus.PAID
+
+
+@pytest.mark.django_db
+def test_invoice_paid_with_rounded_tax(client):
+    # 100.01 + 7.5% tax = 107.51075, shown & stored as 107.51
+    tax = mixer.blend("tax.Tax", rate=7.5)
+    line = mixer.blend("invoice.InvoiceLine", rate="100.01", quantity=1)
+    line.taxes.add(tax)
+    invoice = Invoice.objects.get(pk=line.invoice_id)
+    assert invoice.amount_due == Decimal("107.51")
+
+    mixer.blend("invoice.PaymentReceived", invoice=invoice, amount="107.51")
+    invoice.refresh_from_db()
+    assert invoice.amount_due == 0
+    assert invoice.status == InvoiceStatus.PAID
+
+
+@pytest.mark.django_db
+def test_invoice_totals_signals(client):
+    tax = mixer.blend("tax.Tax", rate=10)
+    line = mixer.blend("invoice.InvoiceLine", rate=100, quantity=1)
+    line.taxes.add(tax)
+    invoice = Invoice.objects.get(pk=line.invoice_id)
+    assert invoice.total_incl_tax == 110
+
+    # clearing the lines of a tax refreshes their invoices
+    tax.invoiceline_set.clear()
+    invoice.refresh_from_db()
+    assert invoice.total_incl_tax == 100
+
+    # deleting an invoice does not refresh its totals line by line
+    for _ in range(3):
+        mixer.blend("invoice.InvoiceLine", invoice=invoice, rate=100, quantity=1)
+    with CaptureQueriesContext(connection) as context:
+        Invoice.objects.get(pk=invoice.pk).delete()
+    queries = [query["sql"] for query in context.captured_queries]
+    assert not any(sql.startswith('UPDATE "invoice_invoice"') for sql in queries)
+
+
+@pytest.mark.django_db
+def test_invoice_number_sequence(client):
+    with CaptureQueriesContext(connection) as context:
+        numbers = reserve_numbers(Invoice.NUMBER_PREFIX, 3)
+        next_number = get_invoice_next_number()
+    assert len(context.captured_queries) == 2
+    assert not any("invoice_invoice" in q["sql"] for q in context.captured_queries)
+    values = [int(number[4:]) for number in [*numbers, next_number]]
+    assert values == list(range(values[0], values[0] + 4))
+
+
+@pytest.mark.django_db
+def test_invoice_lines_written_in_bulk(client, invoice_data, taxes):
+    invoice = mixer.blend("invoice.Invoice")
+    line_data = invoice_data["lines"][0]
+
+    def save_lines(count):
+        existing = [{**line_data, "id": line.id} for line in invoice.lines.all()]
+        new = [dict(line_data) for _ in range(count)]
+        serializer = InvoiceSerializer(
+            invoice, data={**invoice_data, "lines": existing + new}
+        )
+        serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as context:
+            serializer.save()
+        return len(context.captured_queries)
+
+    # the query count does not depend on the number of lines
+    save_lines(1)
+    assert save_lines(2) == save_lines(10)
+    assert invoice.lines.count() == 13
+    line = invoice.lines.last()
+    assert set(line.taxes.all()) == set(taxes)
+    assert invoice.taxes_total == sum(line.taxes_total for line in invoice.lines.all())
+
+    serializer = InvoiceSerializer(invoice, data={**invoice_data, "lines": [line_data]})
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+    assert invoice.lines.count() == 1
+    assert invoice.total_incl_tax == invoice.lines.get().total_incl_tax
+
+
+@pytest.mark.django_db
+def test_invoice_pks_resolved_in_batch(client, invoice_data, items, taxes):
+    lines = [
+        {**line, "taxes": [tax.id for tax in taxes]} for line in invoice_data["lines"]
+    ]
+
+    def validate(count):
+        serializer = InvoiceSerializer(data={**invoice_data, "lines": lines * count})
+        with CaptureQueriesContext(connection) as context:
+            assert serializer.is_valid(), serializer.errors
+        return serializer, len(context.captured_queries)
+
+    # the query count does not depend on the number of lines
+    serializer, queries = validate(1)
+    assert validate(10)[1] == queries
+    line = serializer.validated_data["lines"][0]
+    assert line["item"] == items[0]
+    assert set(line["taxes"]) == set(taxes)
+
+    # unknown pks still fail validation
+    lines[0]["taxes"] = [0]
+    serializer = InvoiceSerializer(data={**invoice_data, "lines": lines})
+    assert not serializer.is_valid()
+    assert "taxes" in serializer.errors["lines"][0]
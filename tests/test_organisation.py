@@ -1,8 +1,14 @@
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django_tenants.utils import schema_context
+from rest_framework.test import APIClient
 from tenant_users.tenants.models import get_public_schema_name
-from apps.organisation.models import Organisation
+from apps.organisation.models import Domain, Organisation
 from apps.user.models import User
+from core.middleware import _MISSING, _tenant_key
 
 
 @pytest.mark.django_db(transaction=True)
@@ -119,3 +125,41 @@ def test_organisation_remove_users(
     assert res.status_code == 200
     assert res.data["removed"] == len(org_added_users)  # removed users
     assert res.data["nonexistent"] == len(users_without_org)  # users not in org
+
+
+@pytest.mark.django_db
+def test_cached_tenant_resolution(client, test_tenant, django_capture_on_commit_callbacks):
+    def domain_queried(api_client, path):
+        with CaptureQueriesContext(connection) as context:
+            res = api_client.get(path)
+        queries = [query["sql"] for query in context.captured_queries]
+        return res.status_code, any('"organisation_domain"' in sql for sql in queries)
+
+    url = reverse("tax-list")
+    client.get(url)
+    assert domain_queried(client, url) == (403, False)
+
+    # unknown subfolders are cached too, until a matching domain is created
+    anon_client = APIClient()
+    assert domain_queried(anon_client, "/org/unknown/") == (404, True)
+    assert domain_queried(anon_client, "/org/unknown/") == (404, False)
+    with schema_context(get_public_schema_name()):
+        domain = Domain.objects.create(domain="unknown", tenant=test_tenant, is_primary=False)
+    assert domain_queried(anon_client, "/org/unknown/") == (200, True)
+    with schema_context(get_public_schema_name()):
+        domain.delete()
+    assert anon_client.get("/org/unknown/").status_code == 404
+
+    # renaming the organisation moves its tenant to the new slug
+    organisation = test_tenant.organisation
+    organisation.name = "renamed"
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        organisation.save()
+    # a concurrent request caches the domains as they were before the
+    # commit, the commit drops them again
+    cache.set(_tenant_key("test"), test_tenant)
+    cache.set(_tenant_key(organisation.get_tenant_slug()), _MISSING)
+    for callback in callbacks:
+        callback()
+    assert anon_client.get(f"/org/{organisation.get_tenant_slug()}/").status_code == 200
+    assert anon_client.get("/org/test/").status_code == 404
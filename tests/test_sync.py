@@ -0,0 +1,38 @@
+import pytest
+from datetime import timedelta
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+
+@pytest.mark.django_db
+def test_sync(client, test_user, invoice_object, settings):
+    settings.SYNC_TOKEN_OVERLAP = timedelta(0)
+    url = reverse("sync")
+    payment = mixer.blend("invoice.PaymentReceived", invoice=invoice_object, amount=10)
+
+    # resources the user cannot view are left out
+    res = client.get(url)
+    assert res.status_code == 200
+    assert res.data["resources"] == {}
+
+    test_user.add_permissions("view_invoice", "view_paymentreceived")
+    res = client.get(url)
+    assert res.data["full"] is True
+    assert set(res.data["resources"]) == {"invoices", "payments_received"}
+    invoices = res.data["resources"]["invoices"]
+    assert [invoice["id"] for invoice in invoices["updated"]] == [invoice_object.id]
+
+    token = res.data["token"]
+    invoice = mixer.blend("invoice.Invoice")
+    payment_id = payment.id
+    payment.delete()
+    res = client.get(url, {"since": token})
+    assert res.status_code == 200
+    assert res.data["full"] is False
+    invoices = res.data["resources"]["invoices"]
+    assert invoice.id in [invoice["id"] for invoice in invoices["updated"]]
+    payments = res.data["resources"]["payments_received"]
+    assert payments == {"updated": [], "deleted": [payment_id]}
+
+    res = client.get(url, {"since": "yesterday"})
+    assert res.status_code == 400
@@ -1,5 +1,11 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from mixer.backend.django import mixer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from apps.tax.views import TaxViewSet
 
 
 @pytest.mark.django_db
@@ -49,3 +55,44 @@ def test_bulk_create_or_update_tax(client, test_user, tax_bulk_data):
     res = client.post(url, tax_bulk_data, format="json")
     assert res.status_code == 201
     assert len(res.data) == len(tax_bulk_data)
+
+
+@pytest.mark.django_db
+def test_list_tax_cached(client, test_user):
+    url = reverse("tax-list")
+    test_user.add_permissions("view_tax")
+    mixer.blend("tax.Tax")
+
+    def list_taxes():
+        with CaptureQueriesContext(connection) as context:
+            res = client.get(url)
+        assert res.status_code == 200
+        queries = [query["sql"] for query in context.captured_queries]
+        return res.data, any('"tax_tax"' in sql for sql in queries)
+
+    data, hit_db = list_taxes()
+    assert len(data) == 1 and hit_db
+    data, hit_db = list_taxes()
+    assert len(data) == 1 and not hit_db
+
+    # saving a tax invalidates the cached list
+    mixer.blend("tax.Tax")
+    data, hit_db = list_taxes()
+    assert len(data) == 2 and hit_db
+
+
+@pytest.mark.django_db
+def test_list_tax_cache_scoped_by_permissions(client, test_user, create_tenant_user):
+    other_user = create_tenant_user("other@localhost")
+    test_user.add_permissions("view_tax")
+    other_user.add_permissions("view_tax")
+
+    def cache_key(user):
+        request = Request(APIRequestFactory().get("/"))
+        request.user = user
+        return TaxViewSet(action="list", kwargs={}).get_response_cache_key(request)
+
+    # users with the same permissions share the cached responses
+    assert cache_key(test_user) == cache_key(other_user)
+    other_user.add_permissions("change_tax")
+    assert cache_key(test_user) != cache_key(other_user)
@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.conf import settings
 from apps.user.models import User
@@ -213,3 +215,58 @@ def test_permissions_source_of_truth(client, test_user, dept_object):
         for perm_data in invoice_model_permissions
         if perm_data["perm"]["codename"] == "change_invoice"
     )
+
+
+@pytest.mark.django_db
+def test_permissions_source_of_truth_query_count(client, test_user, dept_object):
+    test_user.add_permissions("change_user", "change_department")
+    dept_object.add_permissions("change_invoice")
+    dept_object.add_members([test_user])
+    url = reverse("permission-source-of-truth")
+    client.get(url)
+
+    # the cost does not grow with the number of permissions
+    for params in [f"?user={test_user.id}", f"?department={dept_object.id}"]:
+        with CaptureQueriesContext(connection) as context:
+            res = client.get(url + params)
+        assert res.status_code == 200
+        assert len(context.captured_queries) <= 6
+
+    # served from the cache until permissions change
+    with CaptureQueriesContext(connection) as context:
+        assert client.get(url + f"?user={test_user.id}").status_code == 200
+    queries = [query["sql"] for query in context.captured_queries]
+    assert not any('"auth_permission"' in sql for sql in queries)
+    dept_object.remove_members([test_user])
+    res = client.get(url + f"?user={test_user.id}")
+    invoice_perms = [
+        perm_data
+        for category_dict in res.data.values()
+        for perm_data in category_dict.get("invoice", [])
+        if perm_data["perm"]["codename"] == "change_invoice"
+    ]
+    assert invoice_perms
+    assert not any(perm_data["inherited"] for perm_data in invoice_perms)
+
+
+@pytest.mark.django_db
+def test_permissions_cached(client, test_user, dept_object):
+    url = reverse("tax-list")
+    test_user.add_permissions("view_tax")
+    assert client.get(url).status_code == 200
+
+    # once cached, permission checks cost no query
+    with CaptureQueriesContext(connection) as context:
+        assert client.get(url).status_code == 200
+    tables = ['"auth_permission"', '"permissions_usertenantpermissions"']
+    queries = [query["sql"] for query in context.captured_queries]
+    assert not any(table in sql for sql in queries for table in tables)
+
+    # permission & department changes are picked up
+    test_user.tenant_perms.user_permissions.clear()
+    assert client.get(url).status_code == 403
+    dept_object.add_permissions("view_tax")
+    dept_object.add_members([test_user])
+    assert client.get(url).status_code == 200
+    dept_object.remove_members([test_user])
+    assert client.get(url).status_code == 403